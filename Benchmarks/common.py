@@ -0,0 +1,108 @@
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+CATEGORY_NAMES = ["Food", "Transport", "Rent", "Utilities", "Shopping", "Health", "Travel", "Education"]
+PAYMENT_METHODS = ["Cash", "Card", "Bank Transfer", "Wallet"]
+
+
+def setup_environment():
+    """Points the app at a throw-away SQLite database unless a real one is configured. Call before importing app modules."""
+    os.environ.setdefault("APP_ENV", "development")
+    os.environ.setdefault("DATABASE_URL_DEV", "sqlite:///./benchmark.sqlite")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+def fake_expenses(count: int, seed: int = 42) -> list:
+    """Synthetic ExpenseResponse rows shaped like ExpenseService.get_expenses output."""
+    from Schema.ExpenseSchema import ExpenseResponse
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    return [
+        ExpenseResponse(
+            id=i,
+            amount=round(rng.uniform(50, 25000), 2),
+            description=f"Synthetic expense #{i} at store {rng.randint(1, 500)}",
+            date=now - timedelta(minutes=i * 17),
+            category_name=rng.choice(CATEGORY_NAMES),
+            payment_method=rng.choice(PAYMENT_METHODS)
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} TB"
+
+
+def seed_database(session, users: int, transactions_per_user: int, categories_per_user: int = 8,
+                  budgets_per_user: int = 0, chunk_size: int = 10_000, seed: int = 42,
+                  password_hash: str = "not-a-real-hash") -> list:
+    """Creates the schema if needed and bulk-inserts synthetic users, categories, budgets and transactions.
+    Returns the created user ids. Pass a real password_hash for users that must be able to log in."""
+    from sqlalchemy import insert
+    from Models.Database import Base
+    from Models.Table import User, Category, Budget, Transaction
+
+    Base.metadata.create_all(bind=session.get_bind())
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_ids = []
+
+    for user_index in range(users):
+        # Unique per run so benchmarks can be repeated against the same database
+        suffix = f"{seed}_{user_index}_{time.time_ns()}"
+        user = User(
+            username=f"bench_{suffix}",
+            fullname=f"Benchmark User {user_index}",
+            email=f"bench_{suffix}@example.com",
+            password_hash=password_hash
+        )
+        session.add(user)
+        session.flush()
+        user_ids.append(user.id)
+
+        categories = [
+            Category(name=f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i}", type="expense", user_id=user.id)
+            for i in range(categories_per_user)
+        ]
+        session.add_all(categories)
+        session.flush()
+        category_ids = [category.id for category in categories]
+
+        for category_id in category_ids[:budgets_per_user]:
+            session.add(Budget(category_id=category_id, limit_amount=rng.randint(1000, 50000),
+                               month=str(now.month), user_id=user.id))
+
+        batch = []
+        for i in range(transactions_per_user):
+            batch.append({
+                "amount": round(rng.uniform(50, 25000), 2),
+                "date": now - timedelta(minutes=rng.randint(1, 3 * 365 * 24 * 60)),
+                "description": f"Synthetic expense #{i} at store {rng.randint(1, 500)}",
+                "payment_method": rng.choice(PAYMENT_METHODS),
+                "category_id": rng.choice(category_ids),
+                "user_id": user.id
+            })
+            if len(batch) == chunk_size:
+                session.execute(insert(Transaction), batch)
+                batch = []
+        if batch:
+            session.execute(insert(Transaction), batch)
+        session.commit()
+
+    return user_ids
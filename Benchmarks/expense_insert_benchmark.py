@@ -0,0 +1,103 @@
+"""
+Inserts per second of POST /expenses' write path: the old commit-per-write sequence against the unit of work.
+
+"legacy" replays what ExpenseService.add_expense used to do - commit + refresh the new category, commit its log row,
+commit + refresh the transaction, commit its log row. "unit_of_work" calls the current add_expense, which only
+flushes, and commits once per expense the way get_unit_of_work does at the end of a request.
+
+    python -m Benchmarks.expense_insert_benchmark --inserts 2000 --new-category-every 10
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from Benchmarks.common import setup_environment, seed_database
+
+setup_environment()
+
+
+def _legacy_add_expense(db, log, expense, user_id):
+    from Models.Table.Category import Category as CategoryModel
+    from Models.Table.Transaction import Transaction as TransactionModel
+
+    category = db.query(CategoryModel).filter(
+        CategoryModel.name == expense.category_name,
+        CategoryModel.user_id == user_id
+    ).first()
+    if not category:
+        category = CategoryModel(name=expense.category_name, type="expense", user_id=user_id)
+        db.add(category)
+        db.commit()
+        db.refresh(category)
+        log.db_logger("INFO", "New category created for expense", "ExpenseService.AddExpense", "NULL", user_id)
+
+    db_expense = TransactionModel(amount=expense.amount, description=expense.description, date=expense.date,
+                                  category_id=category.id, user_id=user_id, payment_method=expense.payment_method)
+    db.add(db_expense)
+    db.commit()
+    db.refresh(db_expense)
+    log.db_logger("INFO", "Expense added", "ExpenseService.AddExpense", "NULL", user_id)
+    return db_expense.id
+
+
+def _expenses(count: int, new_category_every: int):
+    from Schema.ExpenseSchema import ExpenseCreate
+
+    for i in range(count):
+        category = f"Bench new {i}" if new_category_every and i % new_category_every == 0 else "Food 0"
+        yield ExpenseCreate(amount=100 + i, description=f"Benchmark expense #{i}", date=datetime.now(),
+                            category_name=category, payment_method="Card")
+
+
+def run(inserts: int, new_category_every: int) -> list:
+    from Models.Database import SessionLocal
+    from Logging.Helper.FileandDbLogHandler import FileandDbHandlerLog
+    from Services.ExpenseService import ExpenseService
+
+    results = []
+    for mode in ("legacy", "unit_of_work"):
+        db = SessionLocal()
+        try:
+            user_id = seed_database(db, users=1, transactions_per_user=0)[0]
+            expenses = list(_expenses(inserts, new_category_every))
+            service = ExpenseService(db)
+            log = FileandDbHandlerLog(db)
+
+            started = time.perf_counter()
+            for expense in expenses:
+                if mode == "legacy":
+                    _legacy_add_expense(db, log, expense, user_id)
+                else:
+                    service.add_expense(expense, user_id)
+                    db.commit()
+            elapsed = time.perf_counter() - started
+        finally:
+            db.close()
+
+        results.append({
+            "mode": mode,
+            "inserts": inserts,
+            "seconds": round(elapsed, 3),
+            "inserts_per_second": round(inserts / elapsed, 1)
+        })
+        print(f"{mode:<13} {elapsed:8.2f}s  {inserts / elapsed:>10,.1f} inserts/s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inserts", type=int, default=2000)
+    parser.add_argument("--new-category-every", type=int, default=10,
+                        help="Every Nth expense uses a category that does not exist yet (0 = never)")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.inserts, args.new_category_every)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
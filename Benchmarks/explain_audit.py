@@ -0,0 +1,176 @@
+"""
+Index audit: EXPLAINs every SELECT the read paths in Services/ issue and fails on full scans of the large tables.
+
+Seeds DATABASE_URL_DEV, runs each service call below while recording the statements it sends, then EXPLAINs
+each distinct statement with its real parameters. On PostgreSQL sequential scans are disabled first, so a
+"Seq Scan" left in the plan means no index can serve the query at all; on SQLite a bare "SCAN <table>"
+in EXPLAIN QUERY PLAN is flagged. Exits non-zero when anything is flagged.
+
+    DATABASE_URL_DEV=postgresql://... python -m Benchmarks.explain_audit --users 20 --transactions 5000
+"""
+import argparse
+import re
+import sys
+from datetime import datetime
+
+from Benchmarks.common import setup_environment, seed_database
+
+setup_environment()
+
+LARGE_TABLES = {"transactions", "categories", "budgets", "logging", "subscribers", "users"}
+
+AUTH_EVENT_SOURCES = ["AuthService.Login", "AuthService.Register", "ExpenseService.AddExpense", "BudgetService.AddBudget"]
+
+
+def _service_calls(db, user_id: int, email: str, subscriber_ids: list):
+    from Models.Table.Subscriber import Subscriber
+    from Services.AnalyticsService import AnalyticsService
+    from Services.BudgetService import BudgetService
+    from Services.ExpenseService import ExpenseService
+    from Services.LoggingService import LoggingService
+
+    now = datetime.now()
+    month = str(now.month)
+    expenses, analytics, budgets, logs = ExpenseService(db), AnalyticsService(db), BudgetService(db), LoggingService(db)
+    return [
+        ("ExpenseService.get_expenses", lambda: expenses.get_expenses(user_id)),
+        ("ExpenseService.get_categories", lambda: expenses.get_categories(user_id)),
+        ("ExpenseService.get_previous_month_expenses", lambda: expenses.get_previous_month_expenses(user_id)),
+        ("ExpenseService.stream_previous_month_expenses_by_subscriber",
+         lambda: list(expenses.stream_previous_month_expenses_by_subscriber(subscriber_ids))),
+        ("ExpenseService.iter_expenses_csv", lambda: b"".join(expenses.iter_expenses_csv(user_id))),
+        ("AnalyticsService.get_total_expense_amount", lambda: analytics.get_total_expense_amount(user_id)),
+        ("AnalyticsService.get_monthly_expense_amount",
+         lambda: analytics.get_monthly_expense_amount(user_id, now.year, now.month)),
+        ("AnalyticsService.get_total_transactions", lambda: analytics.get_total_transactions(user_id)),
+        ("AnalyticsService.get_monthly_transactions",
+         lambda: analytics.get_monthly_transactions(user_id, now.year, now.month)),
+        ("AnalyticsService.get_recent_transactions", lambda: analytics.get_recent_transactions(user_id)),
+        ("AnalyticsService.amount_budget_against_transactions",
+         lambda: analytics.amount_budget_against_transactions(user_id, month)),
+        ("BudgetService.get_budgets", lambda: budgets.get_budgets(user_id, month)),
+        ("BudgetService.budget_month_total", lambda: budgets.budget_month_total(user_id, month)),
+        ("LoggingService.get_user_auth_logs", lambda: logs.get_user_auth_logs(user_id, email)),
+        ("LoggingService.return_selected_logging", lambda: logs.return_selected_logging(user_id, email)),
+        ("pdf_tasks active subscribers", lambda: db.query(Subscriber).filter(Subscriber.is_active == True).all()),
+    ]
+
+
+def _seed_logs_and_subscribers(db, user_ids: list, logs_per_user: int):
+    from sqlalchemy import insert
+    from Models.Table import Logging, Subscriber, User
+
+    for user_id in user_ids:
+        db.execute(insert(Logging), [
+            {"loglevel": "INFO", "message": f"Synthetic log #{i}", "ip_address": "127.0.0.1", "exception": "NULL",
+             "event_source": AUTH_EVENT_SOURCES[i % len(AUTH_EVENT_SOURCES)], "user_id": user_id,
+             "event_category": AUTH_EVENT_SOURCES[i % len(AUTH_EVENT_SOURCES)].split(".")[0],
+             "event_action": AUTH_EVENT_SOURCES[i % len(AUTH_EVENT_SOURCES)].split(".")[1],
+             "created_at": datetime.now()}
+            for i in range(logs_per_user)
+        ])
+    emails = [email for email, in db.query(User.email).filter(User.id.in_(user_ids)).all()]
+    subscriber_ids = [
+        db.execute(insert(Subscriber).values(email=email, is_active=i % 10 != 0).returning(Subscriber.id)).scalar()
+        for i, email in enumerate(emails)
+    ]
+    db.commit()
+    return emails, subscriber_ids
+
+
+def _capture_selects(engine, calls) -> dict:
+    """Runs the calls and returns {call name: [(statement, parameters), ...]} for the SELECTs they issued."""
+    from sqlalchemy import event
+
+    captured, current = {}, []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            current.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for name, call in calls:
+            current.clear()
+            call()
+            # The same statement repeated per row (N+1) only needs explaining once
+            distinct = {}
+            for statement, parameters in current:
+                distinct.setdefault((statement, repr(parameters)), (statement, parameters))
+            captured[name] = list(distinct.values())
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def _postgres_seq_scans(conn, statement, parameters) -> list:
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()
+    found, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            found.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get("Plans", []))
+    return found
+
+
+def _sqlite_full_scans(conn, statement, parameters) -> list:
+    found = []
+    for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all():
+        match = re.match(r"SCAN (\w+)$", row[-1])
+        if match and re.sub(r"_\d+$", "", match.group(1)) in LARGE_TABLES:
+            found.append(row[-1])
+    return found
+
+
+def audit(engine, captured: dict) -> list:
+    failures = []
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE")
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            explain = _postgres_seq_scans
+        elif engine.dialect.name == "sqlite":
+            # No ANALYZE: without statistics SQLite assumes big tables, like the seqscan switch-off above
+            explain = _sqlite_full_scans
+        else:
+            raise SystemExit(f"EXPLAIN audit supports postgresql and sqlite, not {engine.dialect.name}")
+
+        for name, statements in captured.items():
+            for statement, parameters in statements:
+                scans = explain(conn, statement, parameters)
+                status = "FAIL" if scans else "ok"
+                print(f"{status:<5} {name}: {', '.join(scans) or 'index access only'}")
+                if scans:
+                    failures.append((name, statement, scans))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=2000, help="Transactions per user")
+    parser.add_argument("--logs", type=int, default=200, help="Log rows per user")
+    parser.add_argument("--verbose", action="store_true", help="Print the SQL of failing statements")
+    args = parser.parse_args()
+
+    from Models.Database import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        user_ids = seed_database(db, users=args.users, transactions_per_user=args.transactions, budgets_per_user=4)
+        emails, subscriber_ids = _seed_logs_and_subscribers(db, user_ids, args.logs)
+        captured = _capture_selects(engine, _service_calls(db, user_ids[0], emails[0], subscriber_ids))
+    finally:
+        db.close()
+
+    failures = audit(engine, captured)
+    if args.verbose:
+        for name, statement, _ in failures:
+            print(f"\n-- {name}\n{statement}")
+    print(f"\n{sum(len(s) for s in captured.values())} statements checked, {len(failures)} with full scans")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
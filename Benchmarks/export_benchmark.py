@@ -0,0 +1,73 @@
+"""
+Throughput and memory of the CSV / NDJSON expense exports on a single large user.
+
+Seeds one user with --rows transactions (1M by default) into DATABASE_URL_DEV, then drains
+ExpenseService.iter_expenses_csv / iter_expenses_ndjson and reports rows per second, bytes produced
+and peak memory traced while streaming.
+
+    python -m Benchmarks.export_benchmark --rows 1000000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from Benchmarks.common import setup_environment, seed_database, format_bytes
+
+setup_environment()
+
+
+def run(rows: int, formats: list, trace_memory: bool) -> list:
+    from Models.Database import SessionLocal
+    from Services.ExpenseService import ExpenseService
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        user_id = seed_database(db, users=1, transactions_per_user=rows)[0]
+        print(f"seeded {rows:,} transactions in {time.perf_counter() - started:.1f}s")
+
+        service = ExpenseService(db)
+        results = []
+        for export_format in formats:
+            stream = service.iter_expenses_csv(user_id) if export_format == "csv" else service.iter_expenses_ndjson(user_id)
+            if trace_memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            size = sum(len(chunk) for chunk in stream)
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+
+            results.append({
+                "rows": rows,
+                "format": export_format,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed),
+                "bytes": size,
+                "peak_traced_bytes": peak
+            })
+            print(f"{export_format:<7} {elapsed:8.2f}s  {rows / elapsed:>12,.0f} rows/s  {format_bytes(size):>10}"
+                  + (f"  peak {format_bytes(peak)}" if peak is not None else ""))
+        return results
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "ndjson"])
+    parser.add_argument("--no-trace", action="store_true", help="Skip tracemalloc, which slows streaming down")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.formats, not args.no_trace)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Cold-start guard: imports the app the way a fresh serverless instance does and fails when it got slower.
+
+Runs `python -X importtime -c "import Controllers.main"` in a new interpreter --repeat times (the fastest run
+counts, so .pyc compilation and a cold disk cache don't), then reports the total import time and the packages
+that cost the most. Exits 1 when the total is over --max-ms, or when any of the heavy subsystems that should
+load on first use (reportlab, celery, authlib, google-auth, qrcode/PIL, redis, ...) is imported at startup.
+
+    python -m Benchmarks.import_time_check
+    python -m Benchmarks.import_time_check --max-ms 800 --top 25 --json import_time.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from Benchmarks.common import setup_environment
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported by the routes that need them, never by Controllers.main itself
+DEFERRED_MODULES = ["reportlab", "celery", "kombu", "authlib", "google.auth", "google.oauth2", "qrcode", "PIL",
+                    "pyotp", "redis", "opentelemetry.sdk"]
+
+
+def parse_importtime(stderr: str) -> list:
+    """'import time: self [us] | cumulative | imported package' lines -> [(name, self_us, cumulative_us, depth)]"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def measure(module: str) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, env=os.environ.copy(), capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def import_total_us(modules: list, module: str) -> int:
+    """Time spent importing module (and its parent packages), leaving out interpreter startup such as site."""
+    package = module.split(".")[0]
+    return sum(cumulative for name, _, cumulative, depth in modules
+               if depth == 0 and name.split(".")[0] == package)
+
+
+def slowest_packages(modules: list, module: str) -> list:
+    """(package, cumulative_us) per top-level package pulled in by module, slowest first."""
+    own = module.split(".")[0]
+    packages = {}
+    for name, _, cumulative, _ in modules:
+        package = name.split(".")[0]
+        if package != own and package not in ("site", "encodings"):
+            packages[package] = max(packages.get(package, 0), cumulative)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def deferred_loaded(modules: list) -> list:
+    names = {name for name, *_ in modules}
+    return [deferred for deferred in DEFERRED_MODULES
+            if any(name == deferred or name.startswith(deferred + ".") for name in names)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="Controllers.main")
+    parser.add_argument("--max-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", 1000)),
+                        help="Fail when importing --module takes longer than this")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="Slowest packages to list")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    setup_environment()
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    totals = [import_total_us(run, args.module) for run in runs]
+    modules = runs[totals.index(min(totals))]
+    total_ms = min(totals) / 1000
+    slowest = slowest_packages(modules, args.module)[:args.top]
+
+    print(f"{'package':<40}{'cumulative':>12}")
+    for package, cumulative_us in slowest:
+        print(f"{package:<40}{cumulative_us / 1000:>10.1f}ms")
+    print(f"\nimport {args.module}: {total_ms:.0f} ms (budget {args.max_ms:.0f} ms), {len(modules)} modules")
+
+    loaded = deferred_loaded(modules)
+    if loaded:
+        print(f"imported at startup but should load on first use: {', '.join(loaded)}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "module": args.module,
+                "total_ms": round(total_ms, 1),
+                "runs_ms": [round(total / 1000, 1) for total in totals],
+                "modules": len(modules),
+                "deferred_loaded": loaded,
+                "slowest": [{"package": package, "cumulative_ms": round(cumulative_us / 1000, 1)}
+                            for package, cumulative_us in slowest],
+            }, f, indent=2)
+
+    if total_ms > args.max_ms or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
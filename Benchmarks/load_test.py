@@ -0,0 +1,172 @@
+"""
+End-to-end load test of Controllers.main:app, in process through an ASGI client (no server or network).
+
+Seeds --users users with --transactions transactions, --categories categories and --budgets budgets each into
+DATABASE_URL_DEV (a local SQLite file unless a Postgres URL is set), then runs --concurrency virtual users
+for --duration seconds. Each virtual user picks weighted scenarios from Benchmarks/scenarios.py (login, add
+expense, list expenses, dashboard analytics, PDF export) and the run reports p50/p95/p99 latency and
+throughput per scenario. Use --json to keep the results and compare runs over time.
+
+    python -m Benchmarks.load_test --users 20 --transactions 2000 --concurrency 10 --duration 30 --json load.json
+
+To load a deployed server instead, seed it with --seed-only and point Locust at it (Benchmarks/locustfile.py).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from Benchmarks.common import setup_environment, seed_database, percentile
+
+setup_environment()
+# The query counter is a development aid; leave it out of the numbers
+os.environ.setdefault("QUERY_DEBUG", "false")
+
+
+def seed_users(users: int, transactions: int, categories: int, budgets: int) -> list:
+    """Seeds users that can log in with LOGIN_PASSWORD. Returns one context per user."""
+    from Benchmarks.scenarios import LOGIN_PASSWORD
+    from Models.Database import SessionLocal
+    from Models.Table.User import User
+    from OAuthandJWT.JWTToken import create_jwt
+    from PasslibPasswordHash.hashpassword import hash_password
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        user_ids = seed_database(db, users=users, transactions_per_user=transactions,
+                                 categories_per_user=categories, budgets_per_user=budgets,
+                                 password_hash=hash_password(LOGIN_PASSWORD))
+        print(f"seeded {users} users x {transactions:,} transactions in {time.perf_counter() - started:.1f}s")
+        seeded = db.query(User).filter(User.id.in_(user_ids)).all()
+        # Tokens shaped like AuthService.login's, so scenarios other than login skip the password hash
+        return [{
+            "id": user.id,
+            "email": user.email,
+            "categories": categories,
+            "token": create_jwt({"id": user.id, "email": user.email, "username": user.username,
+                                 "subscriber_is_active": False, "from_project": "ExpenseTracker"}),
+        } for user in seeded]
+    finally:
+        db.close()
+
+
+async def _virtual_user(client, ctx: dict, deadline: float, rng: random.Random, latencies: dict, failures: dict,
+                        errors: dict):
+    from Benchmarks.scenarios import SCENARIOS, request_kwargs
+
+    weights = [scenario.weight for scenario in SCENARIOS]
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(SCENARIOS, weights)[0]
+        started = time.perf_counter()
+        failed = False
+        for call in scenario.calls:
+            response = await client.request(call.method, call.path, **request_kwargs(call, ctx, rng))
+            if response.status_code >= 400:
+                failed = True
+                errors[f"{scenario.name} {call.method} {call.path} {response.status_code}"] += 1
+        # Failed scenarios are counted, not timed; an error page is usually faster than the real one
+        if failed:
+            failures[scenario.name] += 1
+        else:
+            latencies[scenario.name].append(time.perf_counter() - started)
+
+
+def _stats(latencies: list, failed: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "runs": len(latencies),
+        "errors": failed,
+        "runs_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def summarize(latencies: dict, failures: dict, elapsed: float) -> dict:
+    from Benchmarks.scenarios import SCENARIOS
+
+    results = {
+        scenario.name: _stats(latencies[scenario.name], failures[scenario.name], elapsed)
+        for scenario in SCENARIOS
+    }
+    results["total"] = _stats([value for values in latencies.values() for value in values],
+                              sum(failures.values()), elapsed)
+    return results
+
+
+async def run(contexts: list, concurrency: int, duration: float, seed: int) -> dict:
+    import httpx
+    from Controllers.main import app
+
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    errors = defaultdict(int)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=60) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(
+            _virtual_user(client, contexts[i % len(contexts)], deadline, random.Random(seed + i),
+                          latencies, failures, errors)
+            for i in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "scenarios": summarize(latencies, failures, elapsed),
+        "errors": dict(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=1000, help="Per user")
+    parser.add_argument("--categories", type=int, default=8, help="Per user")
+    parser.add_argument("--budgets", type=int, default=4, help="Per user, at most --categories")
+    parser.add_argument("--concurrency", type=int, default=10, help="Virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--seed-only", metavar="FILE",
+                        help="Only seed, and write the users' emails and tokens to FILE for locustfile.py")
+    args = parser.parse_args()
+
+    contexts = seed_users(args.users, args.transactions, args.categories, min(args.budgets, args.categories))
+    if args.seed_only:
+        with open(args.seed_only, "w") as f:
+            json.dump(contexts, f, indent=2)
+        print(f"wrote {len(contexts)} users to {args.seed_only}")
+        return
+
+    result = asyncio.run(run(contexts, args.concurrency, args.duration, args.seed))
+
+    print(f"\n{'scenario':<15}{'runs':>8}{'errors':>8}{'runs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, stats in result["scenarios"].items():
+        print(f"{name:<15}{stats['runs']:>8}{stats['errors']:>8}{stats['runs_per_second']:>9}"
+              f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}")
+    for error, count in result["errors"].items():
+        print(f"  {count}x {error}")
+
+    if args.json:
+        result["run"] = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": os.getenv("DATABASE_URL_DEV", "").split(":", 1)[0],
+            **{key: value for key, value in vars(args).items() if key not in ("json", "seed_only")},
+        }
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+The load_test.py scenarios for Locust, against a running server (pip install locust).
+
+Seed the server's database first; the file holds the users' emails and tokens:
+
+    DATABASE_URL_DEV=<server db> python -m Benchmarks.load_test --users 50 --seed-only bench_users.json
+    BENCH_USERS_FILE=bench_users.json locust -f Benchmarks/locustfile.py --host http://localhost:8000
+
+The server must share SECRET_KEY with the seeding process, or the tokens are rejected.
+"""
+import json
+import os
+import random
+
+from locust import HttpUser, between
+
+from Benchmarks.scenarios import SCENARIOS, request_kwargs
+
+with open(os.getenv("BENCH_USERS_FILE", "bench_users.json")) as users_file:
+    USERS = json.load(users_file)
+
+
+def _scenario_task(scenario):
+    def run(user):
+        for call in scenario.calls:
+            # Named by template so Locust groups the stats per endpoint, not per query string
+            user.client.request(call.method, call.path, name=f"{scenario.name} {call.path}",
+                                **request_kwargs(call, user.ctx, user.rng))
+
+    run.__name__ = scenario.name
+    return run
+
+
+class ExpenseTrackerUser(HttpUser):
+    wait_time = between(0.5, 2)
+    tasks = {_scenario_task(scenario): scenario.weight for scenario in SCENARIOS}
+
+    def on_start(self):
+        self.ctx = random.choice(USERS)
+        self.rng = random.Random()
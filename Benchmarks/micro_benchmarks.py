@@ -0,0 +1,236 @@
+"""
+Micro-benchmarks of service-layer hot functions, compared against stored baselines.
+
+Each benchmark is timed with timeit: the number of calls per sample is picked by autorange (at least 0.2s),
+then --repeat samples are taken and the median per-call time is reported. Services run against one seeded
+user in DATABASE_URL_DEV (a local SQLite file by default); the Redis benchmarks use fakeredis and are
+skipped when it isn't installed. Nothing needs the network.
+
+    python -m Benchmarks.micro_benchmarks                      # compare with the stored baselines
+    python -m Benchmarks.micro_benchmarks -k analytics         # only names containing "analytics"
+    python -m Benchmarks.micro_benchmarks --save-baseline      # record this machine's numbers
+
+Exits 1 when a benchmark is more than --threshold slower than its baseline, or so much faster (--too-fast)
+that it has most likely stopped measuring anything. Baselines are only comparable on the machine (and Python)
+that recorded them, so record them where the comparison runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from datetime import datetime
+
+from Benchmarks.common import setup_environment, seed_database, fake_expenses
+
+setup_environment()
+# Routine INFO file logs would dominate the output; errors still show
+os.environ.setdefault("LOG_DEFAULT_LEVEL", "WARNING")
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "micro_baselines.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """Registers a setup function; it gets the shared context and returns the zero-argument callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def build_context(rows: int) -> dict:
+    from Models.Database import SessionLocal
+
+    db = SessionLocal()
+    user_id = seed_database(db, users=1, transactions_per_user=rows, budgets_per_user=4)[0]
+    # seed_database writes budgets for the current month
+    return {"db": db, "user_id": user_id, "month": str(datetime.now().month)}
+
+
+@benchmark("expense.get_expenses")
+def _get_expenses(ctx):
+    from Services.ExpenseService import ExpenseService
+
+    service = ExpenseService(ctx["db"])
+    return lambda: service.get_expenses(ctx["user_id"], 0, 100)
+
+
+def _analytics(method: str, *args):
+    def setup(ctx):
+        from Services.AnalyticsService import AnalyticsService
+
+        bound = getattr(AnalyticsService(ctx["db"]), method)
+        call_args = [ctx["month"] if arg == "month" else arg for arg in args]
+        return lambda: bound(ctx["user_id"], *call_args)
+    return setup
+
+
+_NOW = datetime.now()
+for _method, _args in [
+    ("get_total_expense_amount", ()),
+    ("get_monthly_expense_amount", (_NOW.year, _NOW.month)),
+    ("get_total_transactions", ()),
+    ("get_monthly_transactions", (_NOW.year, _NOW.month)),
+    ("get_recent_transactions", ()),
+    ("amount_budget_against_transactions", ("month",)),
+]:
+    benchmark(f"analytics.{_method}")(_analytics(_method, *_args))
+
+
+@benchmark("budget.get_budgets")
+def _get_budgets(ctx):
+    from Services.BudgetService import BudgetService
+
+    service = BudgetService(ctx["db"])
+    return lambda: service.get_budgets(ctx["user_id"], ctx["month"])
+
+
+@benchmark("pdf.generate_expenses_pdf")
+def _generate_pdf(ctx):
+    from Services.PdfService import PdfService
+
+    service = PdfService(ctx["db"], None)
+    rows = fake_expenses(200)
+    return lambda: service.generate_expenses_pdf(rows)
+
+
+def _fake_redis():
+    try:
+        import fakeredis
+    except ImportError:
+        return None
+    import Cache.RedisCache as redis_cache
+
+    redis_cache.redis_client = fakeredis.FakeRedis(decode_responses=True)
+    # Earlier benchmarks may have opened the circuit against a missing real Redis; start closed
+    redis_cache._breaker = redis_cache.CircuitBreaker(redis_cache._probe)
+    return redis_cache
+
+
+@benchmark("cache.set_cache")
+def _set_cache(ctx):
+    redis_cache = _fake_redis()
+    if redis_cache is None:
+        return None
+    payload = [expense.model_dump() for expense in fake_expenses(50)]
+    return lambda: redis_cache.set_cache("bench:expenses", payload)
+
+
+@benchmark("cache.get_cache")
+def _get_cache(ctx):
+    redis_cache = _fake_redis()
+    if redis_cache is None:
+        return None
+    redis_cache.set_cache("bench:expenses", [expense.model_dump() for expense in fake_expenses(50)])
+    return lambda: redis_cache.get_cache("bench:expenses")
+
+
+@benchmark("auth.hash_password")
+def _hash_password(ctx):
+    from PasslibPasswordHash.hashpassword import hash_password
+
+    return lambda: hash_password("bench-password")
+
+
+@benchmark("auth.verify_password_and_hash")
+def _verify_password(ctx):
+    from PasslibPasswordHash.hashpassword import hash_password, verify_password_and_hash
+
+    hashed = hash_password("bench-password")
+    return lambda: verify_password_and_hash("bench-password", hashed)
+
+
+@benchmark("2fa.generate_qrcode")
+def _generate_qrcode(ctx):
+    from TwoFAgoogle.SecretandQRCode import generate_qrcode
+
+    return lambda: generate_qrcode("otpauth://totp/ExpenseTracker:bench%40example.com?secret=JBSWY3DPEHPK3PXP")
+
+
+def measure(func, repeat: int) -> dict:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    samples = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {"median_us": round(statistics.median(samples) * 1e6, 2),
+            "min_us": round(min(samples) * 1e6, 2),
+            "calls_per_sample": number}
+
+
+def machine() -> dict:
+    return {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", dest="keyword", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rows", type=int, default=2000, help="Transactions seeded for the service benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline before failing (0.25 = 25%%)")
+    parser.add_argument("--too-fast", type=float, default=0.2,
+                        help="Fail when faster than this fraction of the baseline; the benchmark has probably "
+                             "stopped doing the work (0.2 = 5x faster)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    stored = {"machine": machine(), "results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    baseline = {} if args.save_baseline else stored["results"]
+    if baseline and stored.get("machine") != machine():
+        print(f"warning: baseline recorded on {stored.get('machine')}, comparisons are only indicative")
+
+    ctx = build_context(args.rows)
+    results = {}
+    regressions = []
+    suspicious = []
+    print(f"{'benchmark':<45}{'median':>12}{'baseline':>12}{'change':>9}")
+    for name, setup in BENCHMARKS.items():
+        if args.keyword and args.keyword not in name:
+            continue
+        func = setup(ctx)
+        if func is None:
+            print(f"{name:<45}{'skipped':>12}")
+            continue
+        results[name] = measure(func, args.repeat)
+
+        median = results[name]["median_us"]
+        reference = baseline.get(name, {}).get("median_us")
+        change = f"{(median / reference - 1) * 100:+.0f}%" if reference else "-"
+        reference_text = f"{reference:.1f}us" if reference else "-"
+        print(f"{name:<45}{median:>10.1f}us{reference_text:>12}{change:>9}")
+        if reference and median > reference * (1 + args.threshold):
+            regressions.append(name)
+        elif reference and median < reference * args.too_fast:
+            suspicious.append(name)
+    ctx["db"].close()
+
+    output = {"machine": machine(), "results": results}
+    if args.save_baseline:
+        # A -k run only replaces the benchmarks it ran
+        merged = {"machine": machine(), "results": {**stored["results"], **results}}
+        with open(args.baseline, "w") as f:
+            json.dump(merged, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+    if suspicious:
+        print(f"\n{len(suspicious)} benchmark(s) under {args.too_fast:.0%} of baseline, check they still do the "
+              f"work (or re-record with --save-baseline): {', '.join(suspicious)}")
+    if regressions or suspicious:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory benchmark for the expense PDF export.
+
+Compares the streaming path used by PdfService.download_expenses_pdf (render into a spooled temp
+file, stream it in chunks) with fully buffering the document in memory and copying it into the
+response body.
+
+    python -m Benchmarks.pdf_memory_benchmark --rows 10000 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+from Benchmarks.common import setup_environment, fake_expenses, format_bytes
+
+setup_environment()
+
+
+def _buffered(pdf_service, expenses):
+    buffer = pdf_service.generate_expenses_pdf(expenses, output=BytesIO())
+    body = buffer.getvalue()
+    return len(body)
+
+
+def _streamed(pdf_service, expenses):
+    from Services.PdfService import PDF_SPOOL_MAX_SIZE, _iter_file
+
+    pdf_file = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE, mode="w+b")
+    pdf_service.generate_expenses_pdf(expenses, output=pdf_file)
+    return sum(len(chunk) for chunk in _iter_file(pdf_file))
+
+
+def run(rows: list) -> list:
+    from Services.PdfService import PdfService
+
+    pdf_service = PdfService(None, None)
+    results = []
+    for count in rows:
+        expenses = fake_expenses(count)
+        for mode, func in (("buffered", _buffered), ("streamed", _streamed)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            size = func(pdf_service, expenses)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append({
+                "rows": count,
+                "mode": mode,
+                "seconds": round(elapsed, 3),
+                "peak_bytes": peak,
+                "pdf_bytes": size
+            })
+            print(f"{count:>8} rows  {mode:<9} {elapsed:8.2f}s  peak {format_bytes(peak):>12}  pdf {format_bytes(size):>12}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Build time and peak RSS of the "table" (platypus) and "canvas" PDF renderers.
+
+Every case runs in a fresh interpreter so ru_maxrss reflects that case only. The platypus Table
+grows super-linearly, so table runs above --max-table-rows are skipped.
+
+    python -m Benchmarks.pdf_renderer_benchmark --rows 1000 5000 10000 50000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from Benchmarks.common import setup_environment, fake_expenses, format_bytes
+
+setup_environment()
+
+
+def _single_case(rows: int, renderer: str):
+    from Services.PdfService import render_expenses_pdf, expense_rows
+    from tempfile import TemporaryFile
+
+    expenses = fake_expenses(rows)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with TemporaryFile() as output:
+        started = time.perf_counter()
+        render_expenses_pdf(expense_rows(expenses), output, renderer)
+        elapsed = time.perf_counter() - started
+        size = output.tell()
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # ru_maxrss is reported in kilobytes on Linux
+    print(json.dumps({
+        "rows": rows,
+        "renderer": renderer,
+        "seconds": round(elapsed, 3),
+        "peak_rss_bytes": peak_rss * 1024,
+        "render_rss_bytes": max(peak_rss - baseline_rss, 0) * 1024,
+        "pdf_bytes": size
+    }))
+
+
+def run(rows: list, renderers: list, max_table_rows: int) -> list:
+    results = []
+    for count in rows:
+        for renderer in renderers:
+            if renderer == "table" and count > max_table_rows:
+                print(f"{count:>8} rows  {renderer:<7} skipped (--max-table-rows {max_table_rows})")
+                continue
+            output = subprocess.run(
+                [sys.executable, "-m", "Benchmarks.pdf_renderer_benchmark", "--single", str(count), renderer],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{count:>8} rows  {renderer:<7} {result['seconds']:8.2f}s  "
+                  f"peak RSS {format_bytes(result['peak_rss_bytes']):>10}  "
+                  f"(+{format_bytes(result['render_rss_bytes'])} while rendering)  "
+                  f"pdf {format_bytes(result['pdf_bytes'])}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 5_000, 10_000, 50_000])
+    parser.add_argument("--renderers", nargs="+", default=["table", "canvas"])
+    parser.add_argument("--max-table-rows", type=int, default=10_000)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--single", nargs=2, metavar=("ROWS", "RENDERER"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        _single_case(int(args.single[0]), args.single[1])
+        return
+
+    results = run(args.rows, args.renderers, args.max_table_rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+The user journeys driven by load_test.py (in-process) and locustfile.py (against a running server).
+
+A scenario is a short sequence of requests timed as one unit, the way a page of the frontend issues them.
+Request bodies and params are built per call from the virtual user's context and a seeded Random.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from Benchmarks.common import CATEGORY_NAMES, PAYMENT_METHODS
+
+LOGIN_PASSWORD = "bench-password"
+
+
+@dataclass
+class Call:
+    method: str
+    path: str
+    params: Optional[Callable] = None
+    json: Optional[Callable] = None
+    auth: bool = True
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: int
+    calls: List[Call] = field(default_factory=list)
+
+
+def _month(ctx, rng):
+    # Matches the month seed_database writes on budgets
+    return {"month": str(datetime.now().month)}
+
+
+def _year_month(ctx, rng):
+    now = datetime.now()
+    return {"year": now.year, "month": now.month}
+
+
+def _new_expense(ctx, rng):
+    category_index = rng.randrange(ctx["categories"])
+    return {
+        "amount": round(rng.uniform(50, 25000), 2),
+        "description": f"Load test expense {rng.randint(1, 10_000)}",
+        "category_name": f"{CATEGORY_NAMES[category_index % len(CATEGORY_NAMES)]} {category_index}",
+        "payment_method": rng.choice(PAYMENT_METHODS),
+    }
+
+
+SCENARIOS = [
+    Scenario("login", 1, [
+        Call("POST", "/api/login", json=lambda ctx, rng: {"email": ctx["email"], "password": LOGIN_PASSWORD},
+             auth=False),
+    ]),
+    Scenario("add_expense", 3, [
+        Call("POST", "/api/expenses", json=_new_expense),
+    ]),
+    Scenario("list_expenses", 5, [
+        Call("GET", "/api/expenses", params=lambda ctx, rng: {"skip": rng.choice([0, 0, 50]), "limit": 50}),
+    ]),
+    Scenario("dashboard", 4, [
+        Call("GET", "/api/total_amount"),
+        Call("GET", "/api/monthly_total", params=_year_month),
+        Call("GET", "/api/total_transactions"),
+        Call("GET", "/api/recent_transactions"),
+        Call("GET", "/api/budgets", params=_month),
+        Call("GET", "/api/budget-against-transactions", params=_month),
+    ]),
+    Scenario("pdf_export", 1, [
+        Call("GET", "/api/expenses/pdf", params=lambda ctx, rng: {"limit": 100}),
+    ]),
+]
+
+
+def request_kwargs(call: Call, ctx: dict, rng) -> dict:
+    kwargs = {}
+    if call.params:
+        kwargs["params"] = call.params(ctx, rng)
+    if call.json:
+        kwargs["json"] = call.json(ctx, rng)
+    if call.auth:
+        kwargs["headers"] = {"Authorization": f"Bearer {ctx['token']}"}
+    return kwargs
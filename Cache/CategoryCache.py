@@ -0,0 +1,44 @@
+import os
+from typing import Dict, Iterable
+
+from sqlalchemy.orm import Session
+
+from Cache.RedisCache import get_cache, set_cache, delete_cache
+from Models.Table.Category import Category as CategoryModel
+
+CATEGORY_MAP_TTL = int(os.getenv("CATEGORY_MAP_TTL", 3600))
+
+
+def categories_cache_key(user_id: int) -> str:
+    """The cached GET /categories response."""
+    return f"categories:{user_id}"
+
+
+def category_map_key(user_id: int) -> str:
+    return f"category_map:{user_id}"
+
+
+def _load_category_map(db: Session, user_id: int) -> Dict[int, str]:
+    category_map = dict(db.query(CategoryModel.id, CategoryModel.name).filter(
+        CategoryModel.user_id == user_id
+    ).all())
+    # JSON objects only have string keys, so the map is cached as [id, name] pairs
+    set_cache(category_map_key(user_id), list(category_map.items()), ex=CATEGORY_MAP_TTL)
+    return category_map
+
+
+def get_category_map(db: Session, user_id: int, required_ids: Iterable[int] = ()) -> Dict[int, str]:
+    """
+    id -> name for all of the user's categories, served from Redis when possible.
+    A cached map missing any of required_ids (a category created after it was cached) is reloaded.
+    """
+    cached = get_cache(category_map_key(user_id))
+    if cached is not None:
+        category_map = {category_id: name for category_id, name in cached}
+        if all(category_id in category_map for category_id in required_ids):
+            return category_map
+    return _load_category_map(db, user_id)
+
+
+def invalidate_category_map(user_id: int):
+    delete_cache(category_map_key(user_id))
@@ -1,7 +1,10 @@
 import json
 import os
-import redis
+import threading
+import time
 from fastapi.encoders import jsonable_encoder
+from Monitoring.Metrics import record_cache_lookup, record_circuit_call, record_circuit_transition
+from Monitoring.Tracing import traced
 
 ENV = os.getenv("APP_ENV")
 
@@ -10,75 +13,244 @@ if ENV == "production":
     REDIS_PORT = int(os.getenv("REDIS_PORT"))
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
     REDIS_DB = int(os.getenv("REDIS_DB"))
-
-    try:
-        redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            password=REDIS_PASSWORD,
-            db=REDIS_DB,
-            ssl=True,
-            decode_responses=True,
-        )
-        redis_client.ping()
-    except Exception as e:
-        redis_client = None
-
 else:
     REDIS_HOST = os.getenv("REDIS_LOCAL_HOST")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+    REDIS_PASSWORD = None
     REDIS_DB = int(os.getenv("REDIS_DB", 0))
 
-    try:
-        redis_client = redis.Redis(
-            host=REDIS_HOST,
-            port=REDIS_PORT,
-            db=REDIS_DB,
-            decode_responses=True,
-        )
-        redis_client.ping()
-    except Exception as e:
-        redis_client = None
+# Short timeouts: waiting on an unreachable Redis costs more than the cache miss it turns into
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+# Connection failures in a row that open the circuit, and seconds it stays open before Redis is re-probed
+REDIS_FAILURE_THRESHOLD = int(os.getenv("REDIS_FAILURE_THRESHOLD", 3))
+REDIS_COOLDOWN = float(os.getenv("REDIS_COOLDOWN", 30))
+
+
+class CircuitBreaker:
+    """
+    closed     calls go to Redis; REDIS_FAILURE_THRESHOLD connection errors in a row open the circuit
+    open       calls skip Redis (a miss, or a no-op for writes) for REDIS_COOLDOWN seconds
+    half_open  after the cool-down a background thread pings Redis while calls keep skipping it; success
+               closes the circuit, failure opens it for another cool-down
+    Calls per state and state changes are counted in Prometheus (redis_circuit_*).
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, probe, failure_threshold: int = REDIS_FAILURE_THRESHOLD, cooldown: float = REDIS_COOLDOWN):
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            with self._lock:
+                if self.state == self.OPEN:
+                    self._set_state(self.HALF_OPEN)
+                    threading.Thread(target=self._run_probe, name="redis-probe", daemon=True).start()
+        state = self.state
+        record_circuit_call(state)
+        return state == self.CLOSED
+
+    def record_success(self):
+        if self.failures:
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
 
+    def _run_probe(self):
+        try:
+            self.probe()
+        except Exception as e:
+            print("Redis probe failed, circuit stays open:", e)
+            with self._lock:
+                self._open()
+            return
+        with self._lock:
+            self.failures = 0
+            self._set_state(self.CLOSED)
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._set_state(self.OPEN)
+
+    def _set_state(self, state: str):
+        self.state = state
+        record_circuit_transition(state)
+
+
+# Created on the first cache call; the pool only connects when a command needs a connection, so neither
+# importing this module nor creating the client waits on Redis
+redis_client = None
+_client_lock = threading.Lock()
+
+
+def _create_client():
+    import redis
+    pool = redis.ConnectionPool(
+        connection_class=redis.SSLConnection if ENV == "production" else redis.Connection,
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        password=REDIS_PASSWORD,
+        db=REDIS_DB,
+        decode_responses=True,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        health_check_interval=30,
+    )
+    return redis.Redis(connection_pool=pool)
+
+
+def _client():
+    global redis_client
+    if redis_client is None:
+        with _client_lock:
+            if redis_client is None:
+                redis_client = _create_client()
+    return redis_client
+
+
+def _get_client():
+    """The shared client, or None while the circuit breaker is skipping Redis."""
+    if not _breaker.allow():
+        return None
+    return _client()
 
+
+def _probe():
+    client = _client()
+    client.ping()
+    _reset_dirty_versions(client)
+
+
+_breaker = CircuitBreaker(_probe)
+
+
+def _record_error(operation: str, e: Exception):
+    import redis
+    # Only an unreachable Redis counts towards opening the circuit, not bad data or a wrong key type
+    if isinstance(e, (redis.ConnectionError, redis.TimeoutError)):
+        _breaker.record_failure()
+    print(f"Redis {operation} error:", e)
+
+
+@traced("redis.set")
 def set_cache(key: str, value, ex: int = 86400):
-    if not redis_client:
+    client = _get_client()
+    if not client:
         return
     try:
         payload = json.dumps(jsonable_encoder(value))
-        redis_client.set(key, payload, ex=ex)
+        client.set(key, payload, ex=ex)
+        _breaker.record_success()
     except Exception as e:
-        print("Redis set_cache error:", e)
+        _record_error("set_cache", e)
 
 
+@traced("redis.get")
 def get_cache(key: str):
-    if not redis_client:
+    client = _get_client()
+    if not client:
         return None
     try:
-        cached = redis_client.get(key)
+        cached = client.get(key)
+        _breaker.record_success()
+        record_cache_lookup(key, bool(cached))
         if cached:
             return json.loads(cached)
         return None
     except Exception as e:
-        print("Redis get_cache error:", e)
+        _record_error("get_cache", e)
         return None
 
 
+@traced("redis.delete")
 def delete_cache(key: str):
-    if not redis_client:
+    client = _get_client()
+    if not client:
         return
     try:
-        redis_client.delete(key)
+        client.delete(key)
+        _breaker.record_success()
     except Exception as e:
-        print("Redis delete_cache error:", e)
+        _record_error("delete_cache", e)
 
 
+@traced("redis.clear_pattern")
 def clear_cache_by_pattern(pattern: str):
     """Use a match pattern. Example: 'analytics:*:5*'"""
-    if not redis_client:
+    client = _get_client()
+    if not client:
+        return
+    try:
+        for k in client.scan_iter(match=pattern):
+            client.delete(k)
+        _breaker.record_success()
+    except Exception as e:
+        _record_error("clear_cache_by_pattern", e)
+
+
+# Version keys whose bump failed in this process. They are deleted as soon as Redis answers again, so the next
+# read re-seeds them from the clock instead of returning the version from before the write
+_dirty_versions = set()
+_dirty_lock = threading.Lock()
+
+
+def _reset_dirty_versions(client):
+    if not _dirty_versions:
         return
+    with _dirty_lock:
+        keys = list(_dirty_versions)
+        client.delete(*keys)
+        _dirty_versions.difference_update(keys)
+
+
+@traced("redis.get_version")
+def get_version(key: str):
+    """Current value of a version counter, or None if Redis is unavailable."""
+    client = _get_client()
+    if not client:
+        return None
+    try:
+        _reset_dirty_versions(client)
+        version = client.get(key)
+        if version is None:
+            # Seed from the clock so a counter lost to eviction never repeats an earlier version
+            client.set(key, time.time_ns(), nx=True)
+            version = client.get(key)
+        _breaker.record_success()
+        return version
+    except Exception as e:
+        _record_error("get_version", e)
+        return None
+
+
+@traced("redis.bump_version")
+def bump_version(key: str) -> bool:
+    """Moves a version counter on. Returns False when Redis is unavailable; the key is then reset once it is back."""
+    client = _get_client()
+    if not client:
+        with _dirty_lock:
+            _dirty_versions.add(key)
+        return False
     try:
-        for k in redis_client.scan_iter(match=pattern):
-            redis_client.delete(k)
+        _reset_dirty_versions(client)
+        client.set(key, time.time_ns(), nx=True)
+        client.incr(key)
+        _breaker.record_success()
+        return True
     except Exception as e:
-        print("Redis clear_cache_by_pattern error:", e)
+        _record_error("bump_version", e)
+        with _dirty_lock:
+            _dirty_versions.add(key)
+        return False
@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import io
+import os
+import shutil
+import tempfile
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List
 
-from Cache.RedisCache import clear_cache_by_pattern, get_cache, set_cache
-from Models.Database import get_db
+from Cache.CategoryCache import categories_cache_key
+from Cache.RedisCache import clear_cache_by_pattern, get_cache, set_cache, bump_version, delete_cache
+from Models.Database import get_unit_of_work, after_commit
 from OAuthandJWT.JWTToken import verify_jwt
-from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList
+from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList, \
+    ExpenseBulkCreate, ExpenseBulkResponse
 from Factory.AbstractFactory import MySqlServiceFactory
 from Interfaces.IExpenseService import IExpenseService
+from Services.ExpenseService import expense_data_version_key
 
 ExpenseRouter = APIRouter(tags=["Expenses"])
 service_factory = MySqlServiceFactory()
 
-def get_expense_service(db: Session = Depends(get_db)) -> IExpenseService:
+# Uploaded statements are spooled here until the import worker picks them up; it must be shared with the worker
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "expense_imports"))
+
+# One session per request, committed before the response is sent (scope="function")
+Unit_Of_Work_DI = Depends(get_unit_of_work, scope="function")
+
+def get_expense_service(db: Session = Unit_Of_Work_DI) -> IExpenseService:
     return service_factory.expense_service(db)
 
 Expense_Db_DI = Depends(get_expense_service)
@@ -20,20 +34,101 @@ Expense_Db_DI = Depends(get_expense_service)
 def get_current_user(payload: dict = Depends(verify_jwt)):
     return payload
 
+def invalidate_expense_caches(user_id: int):
+    clear_cache_by_pattern(f"analytics:*:{user_id}*")
+    clear_cache_by_pattern(f"expenses:{user_id}:*")
+    bump_version(expense_data_version_key(user_id))
+    # Expenses can create categories on the fly
+    delete_cache(categories_cache_key(user_id))
+
 @ExpenseRouter.post("/expenses", response_model=ExpenseResponse)
 def add_expense(
     expense: ExpenseCreate,
     services: IExpenseService = Expense_Db_DI,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: Session = Unit_Of_Work_DI
 ):
     try:
         result = services.add_expense(expense, current_user["id"])
-        clear_cache_by_pattern(f"analytics:*:{current_user['id']}*")
-        clear_cache_by_pattern(f"expenses:{current_user['id']}:*")
+        after_commit(db, lambda: invalidate_expense_caches(current_user["id"]))
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@ExpenseRouter.post("/expenses/bulk", response_model=ExpenseBulkResponse)
+def add_expenses_bulk(
+    request: ExpenseBulkCreate,
+    services: IExpenseService = Expense_Db_DI,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Unit_Of_Work_DI
+):
+    try:
+        result = services.add_expenses_bulk(request.expenses, current_user["id"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    after_commit(db, lambda: invalidate_expense_caches(current_user["id"]))
+    return result
+
+@ExpenseRouter.post("/expenses/bulk/csv", response_model=ExpenseBulkResponse)
+def add_expenses_bulk_csv(
+    file: UploadFile = File(...),
+    services: IExpenseService = Expense_Db_DI,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Unit_Of_Work_DI
+):
+    try:
+        text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        result = services.add_expenses_bulk_csv(text, current_user["id"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    after_commit(db, lambda: invalidate_expense_caches(current_user["id"]))
+    return result
+
+@ExpenseRouter.post("/expenses/import")
+def import_expenses(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=IMPORT_UPLOAD_DIR, suffix=".csv", delete=False) as spooled:
+        shutil.copyfileobj(file.file, spooled, 1024 * 1024)
+
+    # Celery loads on first use, not on every cold start
+    from Webhook.import_tasks import import_expenses_csv, import_task_id
+    try:
+        task = import_expenses_csv.apply_async((current_user["id"], spooled.name),
+                                               task_id=import_task_id(current_user["id"]))
+    except Exception:
+        # Nothing will pick the upload up, so don't leave it behind. The broker error can carry its URL,
+        # so it is not echoed back
+        os.remove(spooled.name)
+        raise HTTPException(status_code=503, detail="Import queue unavailable, please try again shortly")
+    return {"status": "queued", "task_id": task.id}
+
+@ExpenseRouter.get("/expenses/import-status/{task_id}")
+def import_expenses_status(
+    task_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    from Webhook.celery_worker import celery_app
+    from Webhook.import_tasks import import_task_owner
+    if import_task_owner(task_id) != current_user["id"]:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    result = celery_app.AsyncResult(task_id)
+    response = {"task_id": task_id, "state": result.state}
+
+    if result.state in ("PROGRESS", "SUCCESS"):
+        response["progress"] = result.info if result.state == "PROGRESS" else result.result
+    elif result.state == "FAILURE":
+        response["error"] = str(result.result)
+
+    return response
+
 @ExpenseRouter.get("/expenses", response_model=List[ExpenseResponse])
 def get_expenses(
     skip: int = 0,
@@ -53,6 +148,20 @@ def get_expenses(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@ExpenseRouter.get("/expenses/export.csv")
+def export_expenses_csv(
+    services: IExpenseService = Expense_Db_DI,
+    current_user: dict = Depends(get_current_user)
+):
+    return services.export_expenses(current_user["id"], current_user["username"], "csv")
+
+@ExpenseRouter.get("/expenses/export.ndjson")
+def export_expenses_ndjson(
+    services: IExpenseService = Expense_Db_DI,
+    current_user: dict = Depends(get_current_user)
+):
+    return services.export_expenses(current_user["id"], current_user["username"], "ndjson")
+
 @ExpenseRouter.post("/categories", response_model=CategoryResponse)
 def add_category(
     category: CategoryCreate,
@@ -62,7 +171,7 @@ def add_category(
     try:
         result = services.add_category(category, current_user["id"])
         clear_cache_by_pattern(f"analytics:*:{current_user['id']}*")
-        clear_cache_by_pattern(f"categories:{current_user['id']}:*")
+        delete_cache(categories_cache_key(current_user["id"]))
         return result
     except Exception as e:
         raise HTTPException(status_code=400 if "already exists" in str(e) else 500, detail=str(e))
@@ -72,7 +181,7 @@ def get_categories(
     services: IExpenseService = Expense_Db_DI,
     current_user: dict = Depends(get_current_user)
 ):
-    cache_key = f"categories:{current_user['id']}"
+    cache_key = categories_cache_key(current_user["id"])
     cached = get_cache(cache_key)
     if cached:
         return cached
@@ -92,8 +201,7 @@ def edit_expense_list(request : EditExpenseList,
     user_id = current_user["id"]
     result = services.edit_expense_list(user_id, request)
 
-    clear_cache_by_pattern(f"analytics:*:{user_id}*")
-    clear_cache_by_pattern(f"expenses:{user_id}:*")
+    invalidate_expense_caches(user_id)
     return result
 
 @ExpenseRouter.delete("/delete_expense_list_item")
@@ -102,6 +210,5 @@ def delete_expense_list_item(transaction_id: int,
         current_user: dict = Depends(get_current_user)):
     user_id = current_user["id"]
     result = services.delete_expense_list_item(user_id, transaction_id)
-    clear_cache_by_pattern(f"analytics:*:{user_id}*")
-    clear_cache_by_pattern(f"expenses:{user_id}:*")
+    invalidate_expense_caches(user_id)
     return result
\ No newline at end of file
@@ -1,14 +1,19 @@
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
+import os
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
+from starlette import status
 
 from Factory.AbstractFactory import MySqlServiceFactory
 from Interfaces.ILoggingService import ILoggingService
+from Logging.FileAndDbLogging import log_sampling
 from Models.Database import get_db
 from OAuthandJWT.JWTToken import verify_jwt
+from Schema.LoggingSchema import LogSamplingUpdate
 
 app = FastAPI()
 LoggingRouter = APIRouter(tags=["Logging"])
 service_factory = MySqlServiceFactory()
+SECRET_KEY_TRIGGER = os.getenv("QSTASH_CURRENT_SIGNING_KEY")
 
 def get_logging_service(db: Session = Depends(get_db)) -> ILoggingService:
     return service_factory.logging_service(db)
@@ -18,22 +23,68 @@ logging_Db_DI = Depends(get_logging_service)
 def get_current_user(payload: dict = Depends(verify_jwt)):
     return payload
 
+def set_next_cursor(response: Response, next_cursor: str):
+    # Pages are newest first; pass the header back as ?cursor= to get the next one
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
 @LoggingRouter.get("/auth_logging")
-def auth_logging(services: ILoggingService = logging_Db_DI,
+def auth_logging(response: Response,
+                 limit: int = Query(50, ge=1, le=500),
+                 cursor: str = None,
+                 services: ILoggingService = logging_Db_DI,
                  current_user: dict = Depends(get_current_user)):
     try:
         email = current_user["email"]
         user_id =current_user["id"]
-        return services.get_user_auth_logs(user_id, email)
+        logs, next_cursor = services.get_user_auth_logs(user_id, email, limit, cursor)
+        set_next_cursor(response, next_cursor)
+        return logs
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 @LoggingRouter.get("/return_selected_logging")
-def auth_logging(services: ILoggingService = logging_Db_DI,
+def auth_logging(response: Response,
+                 limit: int = Query(50, ge=1, le=500),
+                 cursor: str = None,
+                 services: ILoggingService = logging_Db_DI,
                  current_user: dict = Depends(get_current_user)):
     try:
         email = current_user["email"]
         user_id =current_user["id"]
-        return services.return_selected_logging(user_id, email)
+        logs, next_cursor = services.return_selected_logging(user_id, email, limit, cursor)
+        set_next_cursor(response, next_cursor)
+        return logs
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
+
+def check_secret_key(secret_key: str):
+    if secret_key != SECRET_KEY_TRIGGER:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized: Invalid secret key."
+        )
+
+# File log sampling is held per worker process; apply changes to every worker (or set LOG_SAMPLE_RATES / LOG_LEVELS)
+@LoggingRouter.get("/logging-config")
+def get_logging_config(secret_key: str):
+    check_secret_key(secret_key)
+    return log_sampling.snapshot()
+
+@LoggingRouter.put("/logging-config")
+def update_logging_config(update: LogSamplingUpdate, secret_key: str):
+    check_secret_key(secret_key)
+    try:
+        if update.sample_rate is None and update.level is None:
+            log_sampling.reset(update.pattern)
+        if update.sample_rate is not None:
+            log_sampling.set_sample_rate(update.pattern, update.sample_rate)
+        if update.level is not None:
+            log_sampling.set_level(update.pattern, update.level)
+        return log_sampling.snapshot()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
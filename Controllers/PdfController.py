@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends
-from requests import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
 from Factory.AbstractFactory import MySqlServiceFactory
 from Interfaces.IPdfService import IPdfService
 from Models.Database import get_db
 from OAuthandJWT.JWTToken import verify_jwt
-from  Webhook.pdf_tasks import generate_and_send_monthly_reports
 
 PdfRouter = APIRouter(tags=["Pdf"])
 service_factory = MySqlServiceFactory()
@@ -19,11 +18,13 @@ def get_current_user(payload: dict = Depends(verify_jwt)):
 
 @PdfRouter.get("/expenses/pdf")
 def download_expenses_pdf(
+        request: Request,
         skip: int = 0,
         limit: int = 100,
         services: IPdfService = PDf_Db_DI,
         current_user: dict = Depends(get_current_user)):
     user_id = current_user['id']
     username = current_user['username']
-    return services.download_expenses_pdf(user_id,username,skip,limit)
+    if_none_match = request.headers.get("if-none-match")
+    return services.download_expenses_pdf(user_id,username,skip,limit,if_none_match)
 
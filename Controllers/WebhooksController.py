@@ -1,6 +1,6 @@
 import os
 from fastapi import HTTPException, Depends, APIRouter
-from requests import Session
+from sqlalchemy.orm import Session
 from starlette import status
 
 from Factory.AbstractFactory import MySqlServiceFactory
@@ -8,7 +8,6 @@ from Interfaces.IWebhookService import IWebhookService
 from Models.Database import get_db
 from OAuthandJWT.JWTToken import verify_jwt
 from Schema.SubscriberSchema import SubscriberCreate
-from Webhook.pdf_tasks import generate_and_send_monthly_reports
 
 WebhooksRouter = APIRouter(tags=["Webhooks"])
 service_factory = MySqlServiceFactory()
@@ -46,11 +45,34 @@ def monthly_report_unsubscriber(services: IWebhookService = Webhook_Db_DI,
         raise HTTPException(status_code=404, detail=str(e))
 
 @WebhooksRouter.post("/trigger-monthly-report")
-def trigger_monthly_report(secret_key: str):
+def trigger_monthly_report(secret_key: str, retry_failed: bool = False):
     if secret_key != SECRET_KEY_TRIGGER:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unauthorized: Invalid secret key."
         )
-    task = generate_and_send_monthly_reports()
-    return {"status": "success", "message": task}
\ No newline at end of file
+    # Celery (and the PDF stack behind the task) loads on first use, not on every cold start
+    from Webhook.pdf_tasks import generate_and_send_monthly_reports
+    # retry_failed=true re-sends to subscribers whose delivery was given up on this period
+    task = generate_and_send_monthly_reports.delay(retry_failed)
+    return {"status": "queued", "task_id": task.id}
+
+@WebhooksRouter.get("/monthly-report-status/{task_id}")
+def monthly_report_status(task_id: str, secret_key: str):
+    if secret_key != SECRET_KEY_TRIGGER:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized: Invalid secret key."
+        )
+    from Webhook.celery_worker import celery_app
+    result = celery_app.AsyncResult(task_id)
+    response = {"task_id": task_id, "state": result.state}
+
+    if result.state == "PROGRESS":
+        response["progress"] = result.info
+    elif result.state == "SUCCESS":
+        response["progress"] = result.result
+    elif result.state == "FAILURE":
+        response["error"] = str(result.result)
+
+    return response
\ No newline at end of file
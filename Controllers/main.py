@@ -13,6 +13,10 @@ from Controllers.PdfController import PdfRouter
 from Controllers.TwoFAController import TwoFaRouter
 from Controllers.UserController import UserRouter
 from Controllers.WebhooksController import WebhooksRouter
+from Models.Database import engine
+from Monitoring.Metrics import PrometheusMiddleware, instrument_engine, metrics_endpoint
+from Monitoring.QueryCounter import QUERY_DEBUG, QueryCounterMiddleware, track_queries
+from Monitoring.Tracing import FASTAPI_TRACES_REQUESTS, TRACING_ENABLED, TracingMiddleware, setup_tracing, trace_engine
 from fastapi.responses import JSONResponse
 from fastapi.requests import Request
 
@@ -44,6 +48,24 @@ app.add_middleware(
     secret_key=os.getenv("SECRET_KEY")
 )
 
+#Per-request query counts and N+1 warnings, development/test only
+if QUERY_DEBUG:
+    app.add_middleware(QueryCounterMiddleware)
+    track_queries(engine)
+
+#OpenTelemetry tracing (TRACING_ENABLED=true)
+if TRACING_ENABLED:
+    setup_tracing()
+    if not FASTAPI_TRACES_REQUESTS:
+        app.add_middleware(TracingMiddleware)
+    trace_engine(engine)
+
+#Prometheus metrics, added after every other middleware so it is outermost and times them too.
+#/metrics needs the same secret key as the other operational endpoints
+app.add_middleware(PrometheusMiddleware)
+instrument_engine(engine)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
 app.include_router(AuthRouter, prefix="/api")
 app.include_router(ExpenseRouter, prefix="/api")
 app.include_router(AnalyticsRouter, prefix="/api")
@@ -1,40 +1,44 @@
-from sqlalchemy.orm import Session
+from importlib import import_module
 
-from Services.BudgetService import BudgetService
-from Services.LoggingService import LoggingService
-from Services.PdfService import PdfService
-from Services.TwoFaService import TwoFaService
-from Services.AuthService import AuthService
-from Services.ExpenseService import ExpenseService
-from Services.AnalyticsService import AnalyticsService
-from Services.UserService import UserService
-from Services.EmailService import EmailService
-from Services.WebhookService import WebhookService
+from sqlalchemy.orm import Session
 
 
 class ServiceFactory:
 
+    # Dotted paths, imported on first use so a cold start only pays for the services a request needs
+    # (PdfService pulls in reportlab, AuthService authlib/google-auth/qrcode, WebhookService celery)
     _services = {
-        "auth" : AuthService,
-        "expense" : ExpenseService,
-        "analytics" : AnalyticsService,
-        "user" : UserService,
-        "twofa" : TwoFaService,
-        "logging" : LoggingService,
-        "budget" : BudgetService,
-        "pdf" : PdfService,
-        "webhook" : WebhookService
+        "auth" : "Services.AuthService.AuthService",
+        "expense" : "Services.ExpenseService.ExpenseService",
+        "analytics" : "Services.AnalyticsService.AnalyticsService",
+        "user" : "Services.UserService.UserService",
+        "twofa" : "Services.TwoFaService.TwoFaService",
+        "logging" : "Services.LoggingService.LoggingService",
+        "budget" : "Services.BudgetService.BudgetService",
+        "pdf" : "Services.PdfService.PdfService",
+        "webhook" : "Services.WebhookService.WebhookService"
     }
+    _loaded = {}
+
+    @staticmethod
+    def _load(path : str):
+        service_cls = ServiceFactory._loaded.get(path)
+        if service_cls is None:
+            module_name, _, class_name = path.rpartition(".")
+            service_cls = getattr(import_module(module_name), class_name)
+            ServiceFactory._loaded[path] = service_cls
+        return service_cls
 
     @staticmethod
     def get_services(service_type : str, db : Session):
-        service_cls = ServiceFactory._services.get(service_type.lower())
-        if not service_cls:
+        service_path = ServiceFactory._services.get(service_type.lower())
+        if not service_path:
             raise Exception(f"Service type {service_type} is not supported")
+        service_cls = ServiceFactory._load(service_path)
         if service_type == "auth" or service_type == "user" or service_type == "webhook":
-            email_service = EmailService()
+            email_service = ServiceFactory._load("Services.EmailService.EmailService")()
             return service_cls(db, email_service)
         if service_type == "pdf":
-            expense_service = ExpenseService(db)
+            expense_service = ServiceFactory._load("Services.ExpenseService.ExpenseService")(db)
             return service_cls(db, expense_service)
-        return service_cls(db)
\ No newline at end of file
+        return service_cls(db)
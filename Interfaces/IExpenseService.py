@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
-from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList
+from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList, \
+    ExpenseBulkResponse
 
 
 class IExpenseService(ABC):
@@ -9,6 +10,14 @@ class IExpenseService(ABC):
     def add_expense(self, expense: ExpenseCreate, user_id: int) -> ExpenseResponse:
         pass
 
+    @abstractmethod
+    def add_expenses_bulk(self, expenses: List[ExpenseCreate], user_id: int) -> ExpenseBulkResponse:
+        pass
+
+    @abstractmethod
+    def add_expenses_bulk_csv(self, file, user_id: int) -> ExpenseBulkResponse:
+        pass
+
     @abstractmethod
     def get_expenses(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ExpenseResponse]:
         pass
@@ -27,4 +36,8 @@ class IExpenseService(ABC):
 
     @abstractmethod
     def delete_expense_list_item(self,user_id: int, transaction_id: int) -> str:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def export_expenses(self, user_id: int, username: str, export_format: str):
+        pass
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 
 from Schema.LoggingSchema import GetUserAuthLogsResponse, SelectedLogging
 
@@ -7,9 +7,11 @@ from Schema.LoggingSchema import GetUserAuthLogsResponse, SelectedLogging
 class ILoggingService(ABC):
 
     @abstractmethod
-    def get_user_auth_logs(self, user_id: int, user_email: str) -> GetUserAuthLogsResponse:
+    def get_user_auth_logs(self, user_id: int, user_email: str, limit: int = 50,
+                           cursor: str = None) -> Tuple[List[GetUserAuthLogsResponse], Optional[str]]:
         pass
 
     @abstractmethod
-    def return_selected_logging(self,user_id: int, user_email: str) -> List[SelectedLogging]:
-        pass
\ No newline at end of file
+    def return_selected_logging(self,user_id: int, user_email: str, limit: int = 50,
+                                cursor: str = None) -> Tuple[List[SelectedLogging], Optional[str]]:
+        pass
@@ -3,7 +3,7 @@ from io import BytesIO
 
 
 class IPdfService(ABC):
-    def generate_expenses_pdf(self, expenses: list) -> BytesIO:
+    def generate_expenses_pdf(self, expenses: list, output=None, renderer: str = None) -> BytesIO:
         pass
 
     def download_expenses_pdf(
@@ -11,5 +11,6 @@ class IPdfService(ABC):
             user_id: int,
             username: str,
             skip: int = 0,
-            limit: int = 100):
+            limit: int = 100,
+            if_none_match: str = None):
         pass
\ No newline at end of file
@@ -1,8 +1,126 @@
+import json
 import logging
 import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from fnmatch import fnmatchcase
 from logging.handlers import TimedRotatingFileHandler
 import httpx
 
+# "text" keeps the classic "time - source - LEVEL - message" lines, "json" writes one JSON object per line
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+
+
+def _parse_rules(value: str) -> dict:
+    """'BudgetService.GetBudgets=0.1,UserService.*=0.05' -> {pattern: value}"""
+    rules = {}
+    for rule in filter(None, (part.strip() for part in (value or "").split(","))):
+        pattern, _, setting = rule.partition("=")
+        rules[pattern.strip()] = setting.strip()
+    return rules
+
+
+class LogSampling:
+    """
+    Decides per event source whether a file log line is written. Sample rates (0..1) and minimum levels are
+    matched by fnmatch pattern, most specific (longest) pattern first. WARNING and above, and the sources in
+    LOG_ALWAYS_KEEP (security events), are never sampled or filtered. Rules can be changed at runtime.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.default_rate = float(os.getenv("LOG_DEFAULT_SAMPLE_RATE", 1.0))
+        self.default_level = self._env_level("LOG_DEFAULT_LEVEL", os.getenv("LOG_DEFAULT_LEVEL", "INFO"), logging.INFO)
+        # Replaced, never mutated, under _lock: should_log reads them from request threads without locking
+        self.rates = {pattern: float(rate) for pattern, rate in _parse_rules(os.getenv("LOG_SAMPLE_RATES")).items()}
+        self.levels = {}
+        for pattern, level in _parse_rules(os.getenv("LOG_LEVELS")).items():
+            level_number = self._env_level(f"LOG_LEVELS rule '{pattern}'", level, None)
+            if level_number is not None:
+                self.levels[pattern] = level_number
+        self.always_keep = [pattern.strip() for pattern in
+                            os.getenv("LOG_ALWAYS_KEEP", "AuthService.*,TwoFaService.*").split(",") if pattern.strip()]
+        self.dropped = Counter()
+
+    @staticmethod
+    def _level_number(level: str) -> int:
+        level_number = logging.getLevelName(level.strip().upper())
+        if not isinstance(level_number, int):
+            raise ValueError(f"Unknown log level '{level}'")
+        return level_number
+
+    @classmethod
+    def _env_level(cls, setting: str, level: str, fallback):
+        try:
+            return cls._level_number(level)
+        except ValueError:
+            print(f"Ignoring {setting}: unknown log level '{level}'")
+            return fallback
+
+    @staticmethod
+    def _match(rules: dict, event_source: str, default):
+        for pattern in sorted(rules, key=len, reverse=True):
+            if fnmatchcase(event_source, pattern):
+                return rules[pattern]
+        return default
+
+    def should_log(self, event_source: str, level: int) -> bool:
+        if level >= logging.WARNING or any(fnmatchcase(event_source, pattern) for pattern in self.always_keep):
+            return True
+        rates, levels = self.rates, self.levels
+        keep = (level >= self._match(levels, event_source, self.default_level)
+                and random.random() < self._match(rates, event_source, self.default_rate))
+        if not keep:
+            with self._lock:
+                self.dropped[event_source] += 1
+        return keep
+
+    def set_sample_rate(self, pattern: str, rate: float):
+        if not 0 <= rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        with self._lock:
+            self.rates = {**self.rates, pattern: rate}
+
+    def set_level(self, pattern: str, level: str):
+        level_number = self._level_number(level)
+        with self._lock:
+            self.levels = {**self.levels, pattern: level_number}
+
+    def reset(self, pattern: str):
+        with self._lock:
+            self.rates = {key: value for key, value in self.rates.items() if key != pattern}
+            self.levels = {key: value for key, value in self.levels.items() if key != pattern}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "format": LOG_FORMAT,
+                "default_rate": self.default_rate,
+                "default_level": logging.getLevelName(self.default_level),
+                "rates": dict(self.rates),
+                "levels": {pattern: logging.getLevelName(level) for pattern, level in self.levels.items()},
+                "always_keep": list(self.always_keep),
+                "dropped": dict(self.dropped),
+            }
+
+
+log_sampling = LogSampling()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "source": record.name,
+        }
+        # Fields passed by log_event; plain logger calls only have a message
+        entry.update(getattr(record, "event", None) or {"message": record.getMessage()})
+        return json.dumps(entry, default=str)
+
 def file_and_db_logging(filename: str):
     log_directory = "Logs"
     trim_filename = filename.split(".", 1)[0]
@@ -12,8 +130,12 @@ def file_and_db_logging(filename: str):
     logger = logging.getLogger(filename)
 
     if not logger.handlers:
-        logger.setLevel(logging.INFO)
-        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        # LogSampling does the level filtering, so a runtime DEBUG rule can take effect
+        logger.setLevel(logging.DEBUG)
+        if LOG_FORMAT == "json":
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
         stream_handler = logging.StreamHandler()
         stream_handler.setFormatter(formatter)
@@ -34,8 +156,42 @@ def file_and_db_logging(filename: str):
     return logger
 
 
+def log_event(event_source: str, loglevel: str, message: str, user_id=None, exception: str = None) -> bool:
+    """Writes one file log line for event_source unless sampling drops it. Returns whether it was written."""
+    level = logging.getLevelName(loglevel.upper())
+    if not isinstance(level, int):
+        level = logging.DEBUG
+    if not log_sampling.should_log(event_source, level):
+        return False
+
+    text = f"{message} , user_id : {user_id}"
+    if level >= logging.ERROR:
+        text += f" , exception: {exception}"
+    event = {"message": message, "user_id": user_id}
+    if exception and exception != "NULL":
+        event["exception"] = exception
+
+    file_and_db_logging(event_source).log(level, text, extra={"event": event})
+    return True
+
+
+USER_IP_TIMEOUT = float(os.getenv("USER_IP_TIMEOUT", 2))
+# After a failed lookup (e.g. blocked egress) db logs use "unknown" for this long before trying again
+USER_IP_RETRY_SECONDS = float(os.getenv("USER_IP_RETRY_SECONDS", 60))
+_user_ip = None
+_user_ip_retry_at = 0.0
+
+
 def get_user_ip():
-    ip_url = "https://api.ipify.org"
-    with httpx.Client() as client:
-        response = client.get(ip_url)
-        return response.text
+    """Looked up on the first db log rather than at import, then cached; a cold start never waits on ipify."""
+    global _user_ip, _user_ip_retry_at
+    if _user_ip is None:
+        if time.monotonic() < _user_ip_retry_at:
+            return "unknown"
+        try:
+            with httpx.Client(timeout=USER_IP_TIMEOUT) as client:
+                _user_ip = client.get("https://api.ipify.org").text
+        except httpx.HTTPError:
+            _user_ip_retry_at = time.monotonic() + USER_IP_RETRY_SECONDS
+            return "unknown"
+    return _user_ip
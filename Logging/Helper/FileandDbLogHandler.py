@@ -1,12 +1,10 @@
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from Logging.FileAndDbLogging import get_user_ip, file_and_db_logging
+from Logging.FileAndDbLogging import get_user_ip, log_event
 from Models.Table.Logging import Logging as LoggingModel
 from OAuthandJWT.JWTToken import verify_jwt
 
-user_ip = get_user_ip()
-
 def get_current_user(payload: dict = Depends(verify_jwt)):
     return payload
 
@@ -22,35 +20,33 @@ class FileandDbHandlerLog:
         if final_user_id is None:
             final_user_id = get_id_from_token()
 
-        logger = file_and_db_logging(event_source)
-        loglevel = loglevel.upper()
-        if loglevel == "INFO":
-            logger.info(f"{message} , user_id : {final_user_id}")
-        elif loglevel == "ERROR":
-            logger.error(f"{message} , user_id : {final_user_id} , exception: {exception}")
-        elif loglevel == "WARNING":
-            logger.warning(f"{message} , user_id : {final_user_id}")
-        else:
-            logger.debug(f"{message} , user_id : {final_user_id}")
+        # Sampling and the text/JSON format are decided in log_event (see LogSampling)
+        log_event(event_source, loglevel, message, final_user_id, exception)
 
         return "File logger added in file successfully"
 
-    def db_logger(self, loglevel: str, message: str, event_source: str, exception : str, user_id: int = None):
+    def db_logger(self, loglevel: str, message: str, event_source: str, exception : str, user_id: int = None,
+                  commit: bool = True):
         final_user_id = user_id
         if final_user_id is None:
             final_user_id = get_id_from_token()
 
+        event_category, _, event_action = event_source.partition(".")
         logger_info = LoggingModel(
             loglevel=loglevel,
             message=message,
             event_source=event_source,
-            ip_address=user_ip,
+            event_category=event_category,
+            event_action=event_action or None,
+            ip_address=get_user_ip(),
             exception=exception,
             user_id=final_user_id
         )
 
         self.db.add(logger_info)
-        self.db.commit()
-        self.db.refresh(logger_info)
+        # commit=False leaves the row to the caller's unit of work
+        if commit:
+            self.db.commit()
+            self.db.refresh(logger_info)
 
         return "Logger added in db successfully"
\ No newline at end of file
@@ -26,5 +26,24 @@ def get_db():
     finally:
         db.close()
 
+def after_commit(db, callback):
+    """Runs callback once the unit of work owning db has committed (e.g. cache invalidation)."""
+    db.info.setdefault("after_commit", []).append(callback)
+
+def get_unit_of_work():
+    """Like get_db, but commits once when the request handler returns and rolls back if it raises.
+    Services using it only flush, so a request costs one commit however many rows it writes."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+        for callback in db.info.pop("after_commit", []):
+            callback()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
\ No newline at end of file
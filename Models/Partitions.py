@@ -0,0 +1,115 @@
+"""
+Monthly range partitions of transactions (PostgreSQL, TRANSACTIONS_PARTITIONED=true).
+
+Each month lives in its own partition transactions_pYYYY_MM covering [first of month, first of next month),
+plus a transactions_default partition catching anything outside the created range. Run the maintenance
+command regularly (e.g. daily from cron or Celery beat) so upcoming months exist before rows arrive:
+
+    python -m Models.Partitions create --ahead 3
+    python -m Models.Partitions detach --keep 36
+    python -m Models.Partitions list
+"""
+import argparse
+import os
+import re
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TRANSACTIONS_PARTITIONED = os.getenv("TRANSACTIONS_PARTITIONED", "false").lower() == "true"
+
+PARENT_TABLE = "transactions"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+
+
+def add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{month_start.year:04d}_{month_start.month:02d}"
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent ORDER BY child.relname"
+    ), {"parent": PARENT_TABLE}).scalars())
+
+
+def create_default_partition(conn: Connection):
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+
+def create_month_partition(conn: Connection, month_start: datetime) -> bool:
+    """Creates the partition for one month if missing. Returns True when it was created."""
+    name = partition_name(month_start)
+    if name in list_partitions(conn):
+        return False
+    conn.execute(text(
+        f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{add_months(month_start, 1):%Y-%m-%d}')"
+    ))
+    return True
+
+
+def ensure_partitions(conn: Connection, start: datetime, months_ahead: int = 3) -> List[str]:
+    """Creates monthly partitions from start's month through months_ahead months past the current one."""
+    month = start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = add_months(datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0), months_ahead)
+    created = []
+    while month <= last:
+        if create_month_partition(conn, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def detach_partitions_before(conn: Connection, before: datetime) -> List[str]:
+    """
+    Detaches the monthly partitions that end on or before `before`. They stay behind as plain tables that
+    can be archived or dropped without touching the live table.
+    """
+    detached = []
+    for name in list_partitions(conn):
+        match = PARTITION_NAME.match(name)
+        if match and add_months(datetime(int(match.group(1)), int(match.group(2)), 1), 1) <= before:
+            conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            detached.append(name)
+    return detached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Create missing partitions up to --ahead months from now")
+    create.add_argument("--ahead", type=int, default=3)
+    detach = commands.add_parser("detach", help="Detach partitions older than the last --keep months")
+    detach.add_argument("--keep", type=int, required=True)
+    commands.add_parser("list")
+    args = parser.parse_args()
+
+    from Models.Database import engine
+
+    with engine.begin() as conn:
+        if args.command == "create":
+            # Past months already exist since the migration; creating one over rows sitting in the
+            # default partition would fail, so only the current and upcoming months are added
+            created = ensure_partitions(conn, datetime.now(), args.ahead)
+            print(f"created {len(created)} partitions: {', '.join(created) or '-'}")
+        elif args.command == "detach":
+            this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            detached = detach_partitions_before(conn, add_months(this_month, -args.keep + 1))
+            print(f"detached {len(detached)} partitions: {', '.join(detached) or '-'}")
+        else:
+            print("\n".join(list_partitions(conn)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 
-from sqlalchemy import Integer, Column, String, ForeignKey, Float
+from sqlalchemy import Integer, Column, String, ForeignKey, Numeric, Index
 from sqlalchemy.orm import relationship
 
 from Models.Database import Base
 
 class Budget(Base):
     __tablename__ = "budgets"
+    __table_args__ = (
+        Index("ix_budgets_user_id_month", "user_id", "month"),
+        Index("ix_budgets_user_id_category_id", "user_id", "category_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
-    limit_amount = Column(Float, nullable=False)
+    limit_amount = Column(Numeric(14, 2), nullable=False)
     month = Column(String(7), nullable=False)  # YYYY-MM format
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
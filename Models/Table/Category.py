@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Column, String, ForeignKey
+from sqlalchemy import Integer, Column, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from Models.Database import Base
@@ -6,6 +6,10 @@ from Models.Database import Base
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (
+        # Also the conflict target of the find-or-create INSERT ... ON CONFLICT DO NOTHING
+        Index("uq_categories_user_id_name", "user_id", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), nullable=False)
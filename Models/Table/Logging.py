@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 
 from Models.Database import Base
@@ -8,11 +8,18 @@ from Models.Database import Base
 
 class Logging(Base):
     __tablename__ = "logging"
+    __table_args__ = (
+        # Range scans of the retention job (Webhook/logging_tasks.py)
+        Index("ix_logging_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     loglevel = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     event_source  = Column(String(255), nullable=False)
+    # event_source split at write time, e.g. "AuthService.Login" -> ("AuthService", "Login")
+    event_category = Column(String(100), nullable=True)
+    event_action = Column(String(150), nullable=True)
     ip_address = Column(String(255), nullable=True)
     exception = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.now, nullable=False)
@@ -21,3 +28,7 @@ class Logging(Base):
     # Relationship
     user = relationship("User", back_populates="logs")
 
+
+# Newest-first activity pages per user and category (LoggingService), read with a keyset cursor
+Index("ix_logging_user_id_event_category_created_at",
+      Logging.user_id, Logging.event_category, Logging.created_at.desc())
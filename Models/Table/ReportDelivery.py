@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from Models.Database import Base
+
+
+class ReportDelivery(Base):
+    __tablename__ = "report_deliveries"
+    __table_args__ = (
+        UniqueConstraint("period", "subscriber_id", name="uq_report_deliveries_period_subscriber"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("report_runs.id"), nullable=False)
+    period = Column(String(7), nullable=False)  # YYYY-MM format
+    subscriber_id = Column(Integer, ForeignKey("subscribers.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")  # "pending", "sending", "sent", "failed" or "skipped"
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    run = relationship("ReportRun", back_populates="deliveries")
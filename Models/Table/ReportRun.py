@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.orm import relationship
+
+from Models.Database import Base
+
+
+class ReportRun(Base):
+    __tablename__ = "report_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), unique=True, nullable=False)  # YYYY-MM format
+    status = Column(String(20), nullable=False, default="running")  # "running", "completed" or "partial"
+    total = Column(Integer, nullable=False, default=0)
+    sent = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, default=datetime.now)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    deliveries = relationship("ReportDelivery", back_populates="run")
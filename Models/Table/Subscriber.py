@@ -10,7 +10,7 @@ class Subscriber(Base):
     email = Column(String(255), unique=True, nullable=False)
     name = Column(String(255), nullable=True)
     subscribed_at = Column(DateTime, default=datetime.now)
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
 
     def __repr__(self):
         return f"<Subscriber(email='{self.email}', name='{self.name}')>"
\ No newline at end of file
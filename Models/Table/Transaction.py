@@ -1,17 +1,26 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, Column, String, ForeignKey, Float
+from sqlalchemy import Integer, Column, String, ForeignKey, Numeric, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import DateTime
 
 from Models.Database import Base
+from Models.Partitions import TRANSACTIONS_PARTITIONED, create_default_partition, ensure_partitions
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Per-user listings ordered by date, and per-category totals within a date range
+        Index("ix_transactions_user_id_date", "user_id", "date"),
+        Index("ix_transactions_category_id_date", "category_id", "date"),
+        *([{"postgresql_partition_by": "RANGE (date)"}] if TRANSACTIONS_PARTITIONED else []),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    amount = Column(Float, nullable=False)
-    date = Column(DateTime, default=datetime.now)
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    amount = Column(Numeric(14, 2), nullable=False)  # exact decimal, never Float for money
+    # A partitioned table's primary key has to include the partition key, and every row needs one
+    date = Column(DateTime, default=datetime.now, primary_key=TRANSACTIONS_PARTITIONED,
+                  nullable=not TRANSACTIONS_PARTITIONED)
     description = Column(String(255), nullable=True)
     payment_method = Column(String(255), nullable=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
@@ -19,4 +28,12 @@ class Transaction(Base):
 
     # Relationships
     category = relationship("Category", back_populates="transactions")
-    user = relationship("User", back_populates="transactions")
\ No newline at end of file
+    user = relationship("User", back_populates="transactions")
+
+
+if TRANSACTIONS_PARTITIONED:
+    @event.listens_for(Transaction.__table__, "after_create")
+    def _create_initial_partitions(target, connection, **kw):
+        # create_all() only creates the parent; rows need a partition to land in
+        create_default_partition(connection)
+        ensure_partitions(connection, datetime.now())
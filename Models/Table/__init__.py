@@ -3,4 +3,6 @@ from Models.Table.User import User
 from Models.Table.Transaction import Transaction
 from Models.Table.Category import Category
 from Models.Table.Logging import Logging
-from Models.Table.Subscriber import Subscriber
\ No newline at end of file
+from Models.Table.Subscriber import Subscriber
+from Models.Table.ReportRun import ReportRun
+from Models.Table.ReportDelivery import ReportDelivery
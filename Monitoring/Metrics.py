@@ -0,0 +1,177 @@
+"""
+Prometheus metrics for the API, exposed at /metrics in the text exposition format.
+
+Requests are labelled by route template (/api/expenses/{id}, not the raw path) so label cardinality stays
+bounded. When running several worker processes set PROMETHEUS_MULTIPROC_DIR to an empty, writable directory
+so /metrics aggregates every worker instead of whichever one answered the scrape.
+
+/metrics lists every route with its traffic, error rates and SQL timings, so like the other operational
+endpoints it needs the QSTASH_CURRENT_SIGNING_KEY secret, as ?secret_key= or an "Authorization: Bearer" header
+(Prometheus scrape configs support both, via params or authorization).
+"""
+import hmac
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette import status
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+SECRET_KEY_METRICS = os.getenv("QSTASH_CURRENT_SIGNING_KEY")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template",
+                            ["method", "route"], buckets=LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", ["method"],
+                           multiprocess_mode="livesum")
+REQUESTS_TOTAL = Counter("http_requests_total", "Responses by route template and status code",
+                         ["method", "route", "status"])
+
+REQUEST_DB_QUERIES = Histogram("http_request_db_queries", "SQL statements executed per request",
+                               ["method", "route"], buckets=QUERY_COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in SQL per request",
+                               ["method", "route"], buckets=LATENCY_BUCKETS)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency by statement type",
+                             ["operation"], buckets=LATENCY_BUCKETS)
+
+CACHE_REQUESTS = Counter("cache_requests_total", "Redis cache lookups by key prefix and result",
+                         ["prefix", "result"])
+REDIS_CIRCUIT_CALLS = Counter("redis_circuit_calls_total",
+                              "Cache calls by circuit breaker state; open and half_open calls skip Redis", ["state"])
+REDIS_CIRCUIT_TRANSITIONS = Counter("redis_circuit_transitions_total", "Circuit breaker changes by new state",
+                                    ["state"])
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set per request by PrometheusMiddleware; sync endpoints run in a threadpool with a copy of the context,
+# so they see (and update) the same RequestStats object
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def record_cache_lookup(key: str, hit: bool):
+    CACHE_REQUESTS.labels(key.split(":", 1)[0], "hit" if hit else "miss").inc()
+
+
+def record_circuit_call(state: str):
+    REDIS_CIRCUIT_CALLS.labels(state).inc()
+
+
+def record_circuit_transition(state: str):
+    REDIS_CIRCUIT_TRANSITIONS.labels(state).inc()
+
+
+def instrument_engine(engine: Engine):
+    """Times every statement on engine and adds it to the current request's totals."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_SECONDS.labels(statement.lstrip().split(" ", 1)[0].upper()).observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(exception_context):
+        # after_cursor_execute doesn't fire for a failed statement
+        if exception_context.connection is not None and exception_context.connection.info.get("query_start"):
+            exception_context.connection.info["query_start"].pop()
+
+
+def route_template(scope) -> str:
+    """The full path template of the route that handled the request, e.g. /api/expenses/{id}."""
+    route = scope.get("route")
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is None:
+        # Unmatched paths (404s, scanners) share one label instead of one series per URL
+        return "unmatched"
+    # Routes of an included router may carry their path without the include prefix; recover the prefix
+    # from the part of the request path in front of what the route matched
+    path = scope["path"]
+    for start in range(len(path)):
+        if path[start] == "/" and path_regex.match(path[start:]):
+            return path[:start] + route.path_format
+    return route.path_format
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware, so streaming responses aren't buffered and no extra task is spawned per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        # The route template is only known once routing is done, so in-flight is counted per method
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            _request_stats.reset(token)
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS_TOTAL.labels(method, route, str(status_code)).inc()
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(method, route).observe(stats.db_seconds)
+
+
+def _authorized(request: Request) -> bool:
+    if not SECRET_KEY_METRICS:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    secret_key = request.query_params.get("secret_key") or (token.strip() if scheme.lower() == "bearer" else "")
+    return hmac.compare_digest(secret_key.encode(), SECRET_KEY_METRICS.encode())
+
+
+def metrics_endpoint(request: Request) -> Response:
+    if not _authorized(request):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized: Invalid secret key."
+        )
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
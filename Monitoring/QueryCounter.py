@@ -0,0 +1,144 @@
+"""
+Development/test instrumentation that counts SQL statements per request and flags N+1 patterns.
+
+Enabled by default outside production (QUERY_DEBUG). Every request gets an X-Query-Count header; a request
+running more statements than its budget, or the same statement shape QUERY_REPEAT_THRESHOLD times or more,
+is logged as a WARNING under QueryCounter.*. With QUERY_BUDGET_STRICT=true an over-budget request fails with
+a 500 instead, so it breaks the test that made it. Tests can also pin a budget around any block:
+
+    with assert_query_budget(3):
+        client.get("/api/expenses", headers=headers)
+"""
+import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from Logging.FileAndDbLogging import log_event
+from Monitoring.Metrics import route_template
+
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", str(os.getenv("APP_ENV") != "production")).lower() == "true"
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 15))
+# Per-route overrides: "/api/expenses=3,/api/analytics/*=6" (fnmatch patterns on the route template)
+QUERY_BUDGETS = {
+    pattern.strip(): int(budget)
+    for pattern, _, budget in (rule.partition("=") for rule in os.getenv("QUERY_BUDGETS", "").split(",") if rule)
+}
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 3))
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with bind placeholders (and expanded IN lists) collapsed, so N+1 repeats compare equal."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryLog:
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+
+    def record(self, statement: str):
+        self.count += 1
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries"]
+        lines += [f"  {times}x {shape}" for shape, times in self.repeated(2)]
+        return "\n".join(lines)
+
+
+_query_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+def track_queries(engine: Engine):
+    """Adds every statement on engine to the current request's QueryLog."""
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        log = _query_log.get()
+        if log is not None:
+            log.record(statement)
+
+
+def route_budget(route: str) -> int:
+    for pattern in sorted(QUERY_BUDGETS, key=len, reverse=True):
+        if fnmatchcase(route, pattern):
+            return QUERY_BUDGETS[pattern]
+    return QUERY_BUDGET
+
+
+@contextmanager
+def assert_query_budget(max_queries: int, engine: Engine = None):
+    """
+    Fails with QueryBudgetExceeded when the block runs more than max_queries statements. Counts on the
+    engine itself rather than a contextvar, so requests served by TestClient's event loop thread are included.
+    """
+    if engine is None:
+        from Models.Database import engine
+    log = QueryLog()
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        log.record(statement)
+
+    event.listen(engine, "after_cursor_execute", _record)
+    try:
+        yield log
+    finally:
+        event.remove(engine, "after_cursor_execute", _record)
+    if log.count > max_queries:
+        raise QueryBudgetExceeded(f"Query budget of {max_queries} exceeded: {log.report()}")
+
+
+class QueryCounterMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = QueryLog()
+        token = _query_log.set(log)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Routing is done by now; statements run after this (dependency teardown) aren't counted
+                route = route_template(scope)
+                budget = route_budget(route)
+                if log.count > budget:
+                    log_event("QueryCounter.Budget", "WARNING",
+                              f"{scope['method']} {route} ran {log.count} queries, budget {budget}")
+                    if QUERY_BUDGET_STRICT:
+                        raise QueryBudgetExceeded(f"{scope['method']} {route} exceeded query budget of "
+                                                  f"{budget}: {log.report()}")
+                for shape, times in log.repeated():
+                    log_event("QueryCounter.RepeatedQuery", "WARNING",
+                              f"{scope['method']} {route} ran {times}x (possible N+1): {shape}")
+                message["headers"] = [*message.get("headers", []), (b"x-query-count", str(log.count).encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _query_log.reset(token)
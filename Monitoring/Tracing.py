@@ -0,0 +1,194 @@
+"""
+Optional OpenTelemetry tracing (TRACING_ENABLED=true, needs opentelemetry-sdk).
+
+Spans cover each HTTP request (named by route template), every SQL statement, RedisCache calls, SMTP sends,
+PDF builds and Celery tasks. TRACING_EXPORTER picks where they go:
+
+    otlp  a collector at OTEL_EXPORTER_OTLP_ENDPOINT (default http://localhost:4318), needs
+          opentelemetry-exporter-otlp-proto-http
+    file  one JSON span per line in TRACING_FILE, for offline analysis
+
+When tracing is off, or the SDK isn't installed, traced() returns functions unchanged and nothing is hooked.
+"""
+import functools
+import importlib.util
+import os
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from Monitoring.Metrics import route_template
+
+trace = None
+# The SDK is only imported when asked for; it is a noticeable share of a cold start otherwise
+if os.getenv("TRACING_ENABLED", "false").lower() == "true":
+    try:
+        from opentelemetry import propagate, trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+    except ImportError:
+        trace = None
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true" and trace is not None
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "otlp").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "Logs/traces.jsonl")
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "expense-tracker")
+# Newer FastAPI releases emit request spans themselves once a tracer provider is installed
+FASTAPI_TRACES_REQUESTS = importlib.util.find_spec("fastapi.telemetry") is not None
+
+if os.getenv("TRACING_ENABLED", "false").lower() == "true" and trace is None:
+    print("Tracing disabled: opentelemetry-sdk is not installed")
+
+_setup_lock = threading.Lock()
+_setup_pid = None
+_traced_engines = set()
+
+
+def _span_exporter():
+    if TRACING_EXPORTER == "file":
+        os.makedirs(os.path.dirname(TRACING_FILE) or ".", exist_ok=True)
+        return ConsoleSpanExporter(
+            out=open(TRACING_FILE, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter()
+
+
+def setup_tracing(service_name: str = SERVICE_NAME):
+    """Installs the tracer provider once per process (Celery's prefork children each need their own)."""
+    global _setup_pid
+    if not TRACING_ENABLED or _setup_pid == os.getpid():
+        return
+    with _setup_lock:
+        if _setup_pid == os.getpid():
+            return
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        provider.add_span_processor(BatchSpanProcessor(_span_exporter()))
+        trace.set_tracer_provider(provider)
+        _setup_pid = os.getpid()
+
+
+def get_tracer():
+    return trace.get_tracer("expense-tracker")
+
+
+def traced(name: str, **attributes):
+    """Decorator running the function inside a span; a no-op unless tracing is enabled."""
+    def decorator(func):
+        if not TRACING_ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_as_current_span(name, attributes=attributes):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_engine(engine: Engine):
+    """A client span for each SQL statement run on engine. Safe to call from both the API and worker setup."""
+    if not TRACING_ENABLED or id(engine) in _traced_engines:
+        return
+    _traced_engines.add(id(engine))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_span(conn, cursor, statement, parameters, context, executemany):
+        span = get_tracer().start_span(
+            statement.lstrip().split(" ", 1)[0].upper(),
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": engine.dialect.name, "db.statement": statement},
+        )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end_span(conn, cursor, statement, parameters, context, executemany):
+        conn.info["trace_spans"].pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def _fail_span(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("trace_spans"):
+            span = conn.info["trace_spans"].pop()
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+class TracingMiddleware:
+    """A server span per request, continuing the caller's trace when a traceparent header is sent."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        span = get_tracer().start_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(headers),
+            kind=SpanKind.SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
+            await send(message)
+
+        try:
+            with trace.use_span(span, end_on_exit=False):
+                await self.app(scope, receive, send_wrapper)
+        except Exception as ex:
+            span.record_exception(ex)
+            span.set_status(Status(StatusCode.ERROR))
+            raise
+        finally:
+            route = route_template(scope)
+            span.set_attribute("http.route", route)
+            span.update_name(f"{scope['method']} {route}")
+            span.end()
+
+
+def trace_celery(service_name: str = f"{SERVICE_NAME}-worker"):
+    """A span for each Celery task run in this worker."""
+    if not TRACING_ENABLED:
+        return
+
+    from celery.signals import task_failure, task_postrun, task_prerun
+
+    spans = {}
+
+    @task_prerun.connect(weak=False)
+    def _start_task_span(task_id=None, task=None, **kwargs):
+        setup_tracing(service_name)
+        span = get_tracer().start_span(f"celery {task.name}", kind=SpanKind.CONSUMER,
+                                       attributes={"celery.task_id": task_id, "celery.task_name": task.name})
+        spans[task_id] = (span, trace.use_span(span, end_on_exit=False))
+        spans[task_id][1].__enter__()
+
+    @task_failure.connect(weak=False)
+    def _fail_task_span(task_id=None, exception=None, **kwargs):
+        if task_id in spans:
+            spans[task_id][0].record_exception(exception)
+            spans[task_id][0].set_status(Status(StatusCode.ERROR))
+
+    @task_postrun.connect(weak=False)
+    def _end_task_span(task_id=None, state=None, **kwargs):
+        if task_id not in spans:
+            return
+        span, scope = spans.pop(task_id)
+        span.set_attribute("celery.state", str(state))
+        scope.__exit__(None, None, None)
+        span.end()
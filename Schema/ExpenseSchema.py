@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 
 class ExpenseCreate(BaseModel):
     amount: float
@@ -9,6 +9,13 @@ class ExpenseCreate(BaseModel):
     date: Optional[datetime] = None
     payment_method : str
 
+class ExpenseBulkCreate(BaseModel):
+    expenses: List[ExpenseCreate]
+
+class ExpenseBulkResponse(BaseModel):
+    inserted: int
+    categories_created: int
+
 class ExpenseResponse(BaseModel):
     id: int
     amount: float
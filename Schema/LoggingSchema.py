@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Optional
 
 class GetUserAuthLogsResponse(BaseModel):
     email: str
@@ -12,4 +13,9 @@ class SelectedLogging(BaseModel):
     email: str
     message: str
     ip_address: str
-    datetime: datetime
\ No newline at end of file
+    datetime: datetime
+
+class LogSamplingUpdate(BaseModel):
+    pattern: str
+    sample_rate: Optional[float] = None
+    level: Optional[str] = None
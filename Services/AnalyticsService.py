@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import List
 
 from fastapi import HTTPException
-from sqlalchemy import extract, func
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from starlette import status
 
@@ -12,6 +12,20 @@ from Models.Table.Transaction import Transaction as TransactionModel
 from Models.Table.Category import Category as CategoryModel
 from Logging.Helper.FileandDbLogHandler import FileandDbHandlerLog
 from Models.Table.Budget import Budget as BudgetModel
+from Cache.CategoryCache import get_category_map
+from Services.ExpenseService import month_range
+
+def budget_month_range(month: str):
+    """
+    Budgets store a month number without a year and are only ever set for the current month, so a budget's
+    month is its most recent occurrence: this year, or last year for a month still ahead of us.
+    """
+    if not month.isdigit() or not 1 <= int(month) <= 12:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Month must be a number 1-12")
+    now = datetime.now()
+    year = now.year if int(month) <= now.month else now.year - 1
+    return month_range(year, int(month))
+
 
 class AnalyticsService(IAnalyticsService):
     def __init__(self, db: Session):
@@ -49,16 +63,14 @@ class AnalyticsService(IAnalyticsService):
 
     def get_monthly_expense_amount(self, user_id: int, year: int, month: int) -> float:
         try:
-            expenses = self.db.query(TransactionModel).filter(
+            start, end = month_range(year, month)
+            total = self.db.query(func.sum(TransactionModel.amount)).filter(
                 TransactionModel.user_id == user_id,
-                extract('year', TransactionModel.date) == year,
-                extract('month', TransactionModel.date) == month
-            ).all()
-
-            if expenses:
-                result = sum(exp.amount for exp in expenses)
-            else:
-                result = 0.0
+                TransactionModel.date >= start,
+                TransactionModel.date < end
+            ).scalar()
+
+            result = float(total) if total else 0.0
                 
             logger_message = f"Monthly expense amount, year {year}, month {month}: {result}"
             self.file_and_db_handler_log.file_logger(
@@ -110,10 +122,11 @@ class AnalyticsService(IAnalyticsService):
 
     def get_monthly_transactions(self, user_id: int, year: int, month: int) -> int:
         try:
+            start, end = month_range(year, month)
             result = self.db.query(TransactionModel).filter(
                 TransactionModel.user_id == user_id,
-                extract('year', TransactionModel.date) == year,
-                extract('month', TransactionModel.date) == month
+                TransactionModel.date >= start,
+                TransactionModel.date < end
             ).count()
             
             logger_message = f"Monthly transaction count retrieved, year {year}, month {month}: {result}"
@@ -147,16 +160,16 @@ class AnalyticsService(IAnalyticsService):
                 .all()
             )
 
+            category_map = get_category_map(self.db, user_id, {expense.category_id for expense in expenses})
             results = []
             for expense in expenses:
-                category = self.db.query(CategoryModel).filter(CategoryModel.id == expense.category_id).first()
                 results.append(
                     ExpenseResponse(
                         id=expense.id,
                         amount=expense.amount,
                         description=expense.description,
                         date=expense.date,
-                        category_name=category.name if category else "Unknown",
+                        category_name=category_map.get(expense.category_id, "Unknown"),
                         payment_method=expense.payment_method if expense.payment_method is not None else "Unknown"
                     )
                 )
@@ -185,30 +198,39 @@ class AnalyticsService(IAnalyticsService):
     def amount_budget_against_transactions(self, user_id: int, month: str):
         try:
             result = []
-            user_budget = self.db.query(BudgetModel).filter(BudgetModel.user_id == user_id,
-                                                            BudgetModel.month == month).all()
-            if user_budget is not None:
-                for budgets in user_budget:
-                    budget_categories = self.db.query(CategoryModel).filter(CategoryModel.id == budgets.category_id).all()
-                    for categories in budget_categories:
-                        transaction_category = (self.db.query(TransactionModel).filter
-                                                (TransactionModel.category_id == categories.id,
-                                                 extract('month', TransactionModel.date) == month).all())
-                        total = sum(t.amount for t in transaction_category)
-
-                        if total == 0:
-                            continue
-
-                        result.append(
-                            BudgetAgainstTransaction(
-                                budget_limit_amount= budgets.limit_amount,
-                                category_name= categories.name,
-                                spent_amount= total
-                            )
-                        )
-
+            user_budget = self.db.query(BudgetModel.limit_amount, CategoryModel.id, CategoryModel.name).join(
+                CategoryModel, CategoryModel.id == BudgetModel.category_id
+            ).filter(BudgetModel.user_id == user_id, BudgetModel.month == month).all()
+            if not user_budget:
                 return result
-            return 0
+
+            # One grouped sum for every budgeted category instead of a category and a sum query per budget,
+            # summed in SQL on the NUMERIC column so the totals are exact. A date range rather than
+            # extract(month) keeps the (user_id, date) index and monthly partition pruning usable.
+            start, end = budget_month_range(month)
+            totals = dict(
+                self.db.query(TransactionModel.category_id, func.sum(TransactionModel.amount)).filter(
+                    TransactionModel.user_id == user_id,
+                    TransactionModel.category_id.in_({budget.id for budget in user_budget}),
+                    TransactionModel.date >= start,
+                    TransactionModel.date < end
+                ).group_by(TransactionModel.category_id).all()
+            )
+
+            for budgets in user_budget:
+                total = totals.get(budgets.id)
+                if not total:
+                    continue
+
+                result.append(
+                    BudgetAgainstTransaction(
+                        budget_limit_amount= float(budgets.limit_amount),
+                        category_name= budgets.name,
+                        spent_amount= float(total)
+                    )
+                )
+
+            return result
         except Exception as ex:
             code = getattr(500, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
             if isinstance(ex, HTTPException):
@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import List
 
 from fastapi import HTTPException
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from starlette import status
 
@@ -133,12 +134,9 @@ class BudgetService(IBudgetService):
 
     def budget_month_total(self, user_id: int, month: str):
         try:
-            user_budget = self.db.query(BudgetModel).filter(BudgetModel.user_id == user_id,
-                                                            BudgetModel.month == month).all()
-            if user_budget is []:
-                result = 0.0
-            else:
-                result = sum(exp.limit_amount for exp in user_budget)
+            total = self.db.query(func.sum(BudgetModel.limit_amount)).filter(BudgetModel.user_id == user_id,
+                                                                              BudgetModel.month == month).scalar()
+            result = float(total) if total else 0.0
 
             logger_message = f"Retrieved monthly budget total {result} for user, month {month}"
             self.file_and_db_handler_log.file_logger(
@@ -7,6 +7,7 @@ from email.mime.application import MIMEApplication
 from fastapi import HTTPException
 from starlette import status
 from Interfaces.IEmailService import IEmailService
+from Monitoring.Tracing import traced
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -19,6 +20,7 @@ ENABLESSL = os.getenv("ENABLESSL", "true").lower() == "true"
 
 
 class EmailService(IEmailService):
+    @traced("smtp.send")
     def send_email(self, user_email: str, subject: str, body: str):
         try:
             msg = MIMEMultipart()
@@ -211,6 +213,7 @@ class EmailService(IEmailService):
        </html>
        """
 
+    @traced("smtp.send_with_pdf")
     def send_email_with_pdf(self, user_email: str, subject: str, body: str,pdf_path: str = None, pdf_buffer=None, filename: str = None):
         try:
             msg = MIMEMultipart()
@@ -1,87 +1,189 @@
-from typing import List
+import csv
+import hashlib
+import io
+import json
+from itertools import groupby, islice
+from typing import List, Iterator, Tuple, Dict, Iterable, TextIO
 from fastapi import HTTPException
-from sqlalchemy import extract
+from pydantic import ValidationError
+from sqlalchemy import and_, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from starlette import status
+from starlette.responses import StreamingResponse
 from Interfaces.IExpenseService import IExpenseService
-from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList
+from Schema.ExpenseSchema import ExpenseCreate, ExpenseResponse, CategoryCreate, CategoryResponse, EditExpenseList, \
+    ExpenseBulkResponse
 from Models.Table.Transaction import Transaction as TransactionModel
 from Models.Table.Category import Category as CategoryModel
+from Models.Table.Subscriber import Subscriber as SubscriberModel
+from Models.Table.User import User as UserModel
 from Logging.Helper.FileandDbLogHandler import FileandDbHandlerLog
+from Cache.CategoryCache import get_category_map, invalidate_category_map
+
+
+def month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """
+    Returns [start, end) of a calendar month. Filtering on this range instead of extract(year/month)
+    lets the (user_id, date) index and monthly partition pruning apply.
+    """
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def previous_month_range() -> Tuple[datetime, datetime]:
+    """Returns [start, end) of the previous calendar month, usable as an index-friendly date range."""
+    last_month = datetime.now().replace(day=1) - timedelta(days=1)
+    return month_range(last_month.year, last_month.month)
+
+
+# Rows fetched per round trip from the server-side cursor, and rows buffered per streamed chunk
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FIELDS = ["id", "date", "amount", "description", "category_name", "payment_method"]
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+# Upper bound on rows accepted by one bulk request; bigger imports go through the background CSV import
+MAX_BULK_EXPENSES = 5000
+CSV_REQUIRED_COLUMNS = {"amount", "category_name", "payment_method"}
+
+
+def is_future_date(date: datetime) -> bool:
+    if date is None:
+        return False
+    if date.tzinfo is None:
+        return date > datetime.now()
+    return date > datetime.now(timezone.utc)
+
+
+def storage_date(date: datetime):
+    """
+    Dates are stored as naive local time (the DateTime column has no zone), so timezone-aware input is
+    converted first. Every write path goes through this so fingerprints match whichever endpoint stored a row.
+    """
+    if date is not None and date.tzinfo is not None:
+        return date.astimezone().replace(tzinfo=None)
+    return date
+
+
+def parse_expenses_csv(lines: Iterable[str], start_line: int = 2) -> Iterator[ExpenseCreate]:
+    """
+    Lazily parses CSV rows with columns amount, category_name, payment_method and optional
+    description and date into ExpenseCreate objects. Raises a 400 naming the offending line.
+    """
+    reader = csv.DictReader(lines)
+    try:
+        missing = CSV_REQUIRED_COLUMNS - set(reader.fieldnames or [])
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"CSV is missing required column(s): {', '.join(sorted(missing))}"
+            )
+
+        for line_number, row in enumerate(reader, start=start_line):
+            try:
+                yield ExpenseCreate(
+                    amount=row["amount"],
+                    category_name=(row["category_name"] or "").strip(),
+                    payment_method=(row["payment_method"] or "").strip(),
+                    description=row.get("description") or None,
+                    date=row.get("date") or None
+                )
+            except ValidationError as ex:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid expense on line {line_number}: {ex.errors()[0]['msg']}"
+                )
+    # Raised while reading, e.g. a file saved as Latin-1 or Excel's UTF-16
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV is not UTF-8 encoded, save it as UTF-8 and upload it again"
+        )
+    except csv.Error as ex:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed CSV on line {reader.line_num + 1}: {ex}"
+        )
+
+
+def expense_fingerprint(date: datetime, amount: float, description: str) -> str:
+    """Identity of an expense for import de-duplication: same date, amount and description."""
+    return hashlib.sha1(f"{date.isoformat()}|{float(amount):.2f}|{description or ''}".encode("utf-8")).hexdigest()
+
+
+def expense_data_version_key(user_id: int) -> str:
+    """Redis counter bumped on every expense write; artifacts derived from a user's expenses key on it."""
+    return f"expenses:version:{user_id}"
+
 
 class ExpenseService(IExpenseService):
     def __init__(self, db: Session):
         self.db = db
         self.file_and_db_handler_log = FileandDbHandlerLog(db)
 
-    def _log(self, user_id: int, level: str, message: str, source: str, exception: str = "NULL"):
+    def _log(self, user_id: int, level: str, message: str, source: str, exception: str = "NULL", commit: bool = True):
         self.file_and_db_handler_log.file_logger(
             loglevel=level, message=message, event_source=source, exception=exception, user_id=user_id
         )
         self.file_and_db_handler_log.db_logger(
-            loglevel=level, message=message, event_source=source, exception=exception, user_id=user_id
+            loglevel=level, message=message, event_source=source, exception=exception, user_id=user_id,
+            commit=commit
         )
 
     def add_expense(self, expense: ExpenseCreate, user_id: int) -> ExpenseResponse:
+        """Only flushes: the category, transaction and log rows are committed together by the caller's
+        unit of work (get_unit_of_work), and ids come back from the INSERT itself instead of a refresh."""
         try:
-            category = self.db.query(CategoryModel).filter(
-                CategoryModel.name == expense.category_name,
-                CategoryModel.user_id == user_id
-            ).first()
-
-            if not category:
-                category = CategoryModel(
-                    name=expense.category_name,
-                    type="expense",
-                    user_id=user_id
+            if is_future_date(expense.date):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="You can't add the future expense, correct the date"
                 )
-                self.db.add(category)
-                self.db.commit()
-                self.db.refresh(category)
 
+            category_ids, categories_created = self._resolve_category_ids([expense.category_name], user_id)
+
+            if categories_created:
                 logger_message = f"New category '{expense.category_name}' created for expense"
                 self._log(user_id,
                           "INFO",
                           logger_message,
-                          "ExpenseService.AddExpense")
-
-            from datetime import datetime, timezone
-
-            if expense.date and expense.date > datetime.now(timezone.utc):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="You can't add the future expense, correct the date"
-                )
+                          "ExpenseService.AddExpense",
+                          commit=False)
 
             db_expense = TransactionModel(
                 amount=expense.amount,
                 description=expense.description,
-                date=expense.date,
-                category_id=category.id,
+                date=storage_date(expense.date),
+                category_id=category_ids[expense.category_name],
                 user_id=user_id,
                 payment_method = expense.payment_method
             )
 
             self.db.add(db_expense)
-            self.db.commit()
-            self.db.refresh(db_expense)
+            self.db.flush()
 
             logger_message = f"Expense of {expense.amount} added with description: {expense.description}"
             self._log(user_id,
                       "INFO",
                       logger_message,
-                      "ExpenseService.AddExpense")
+                      "ExpenseService.AddExpense",
+                      commit=False)
 
             return ExpenseResponse(
                 id=db_expense.id,
                 amount=db_expense.amount,
                 description=db_expense.description,
                 date=db_expense.date,
-                category_name=category.name,
+                category_name=expense.category_name,
                 payment_method=db_expense.payment_method
             )
         except Exception as ex:
+            # Drop the half-done unit of work so the error log below commits on its own
+            self.db.rollback()
             logger_message = f"Error adding expense with amount {expense.amount}"
             self._log(user_id,
                       "ERROR",
@@ -90,21 +192,190 @@ class ExpenseService(IExpenseService):
                       str(ex))
             raise ex
 
+    def add_expenses_bulk(self, expenses: List[ExpenseCreate], user_id: int) -> ExpenseBulkResponse:
+        """Only flushes, like add_expense: the caller's unit of work commits the rows and the log entry together."""
+        try:
+            if not expenses:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No expenses provided"
+                )
+            if len(expenses) > MAX_BULK_EXPENSES:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"At most {MAX_BULK_EXPENSES} expenses can be added at once"
+                )
+            if any(is_future_date(expense.date) for expense in expenses):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="You can't add the future expense, correct the date"
+                )
+
+            category_ids, categories_created = self._resolve_category_ids(
+                {expense.category_name for expense in expenses}, user_id
+            )
+            self._insert_transactions([
+                {
+                    "amount": expense.amount,
+                    "description": expense.description,
+                    "date": storage_date(expense.date) or datetime.now(),
+                    "category_id": category_ids[expense.category_name],
+                    "user_id": user_id,
+                    "payment_method": expense.payment_method
+                }
+                for expense in expenses
+            ])
+
+            logger_message = f"Bulk added {len(expenses)} expenses, {categories_created} new categories created"
+            self._log(user_id,
+                      "INFO",
+                      logger_message,
+                      "ExpenseService.AddExpensesBulk",
+                      commit=False)
+
+            return ExpenseBulkResponse(inserted=len(expenses), categories_created=categories_created)
+        except Exception as ex:
+            # Drop the half-done unit of work so the error log below commits on its own
+            self.db.rollback()
+            logger_message = f"Error bulk adding {len(expenses)} expenses"
+            self._log(user_id,
+                      "ERROR",
+                      logger_message,
+                      "ExpenseService.AddExpensesBulk",
+                      str(ex))
+            raise ex
+
+    def add_expenses_bulk_csv(self, file: TextIO, user_id: int) -> ExpenseBulkResponse:
+        expenses = list(islice(parse_expenses_csv(file), MAX_BULK_EXPENSES + 1))
+        return self.add_expenses_bulk(expenses, user_id)
+
+    def import_expenses_chunk(self, expenses: List[ExpenseCreate], user_id: int, seen: set) -> Dict[str, int]:
+        """
+        Inserts one chunk of a large import in a single transaction. Rows dated in the future are skipped,
+        as add_expense would reject them, and so are rows whose (date, amount, description) fingerprint is
+        already stored for the user or appeared earlier in the import (tracked in seen). Undated rows are
+        skipped too: stamped with the import time they would get a new fingerprint on every re-upload.
+        """
+        candidates = []
+        future = 0
+        undated = 0
+        for expense in expenses:
+            if expense.date is None:
+                undated += 1
+                continue
+            if is_future_date(expense.date):
+                future += 1
+                continue
+            candidates.append((expense, storage_date(expense.date)))
+
+        existing = set()
+        if candidates:
+            stored = self.db.query(
+                TransactionModel.date, TransactionModel.amount, TransactionModel.description
+            ).filter(
+                TransactionModel.user_id == user_id,
+                TransactionModel.date.in_({date for _, date in candidates})
+            ).all()
+            existing = {expense_fingerprint(row.date, row.amount, row.description) for row in stored}
+
+        rows = []
+        duplicates = 0
+        for expense, date in candidates:
+            fingerprint = expense_fingerprint(date, expense.amount, expense.description)
+            if fingerprint in existing or fingerprint in seen:
+                duplicates += 1
+                continue
+            seen.add(fingerprint)
+            rows.append((expense, date))
+
+        categories_created = 0
+        if rows:
+            category_ids, categories_created = self._resolve_category_ids(
+                {expense.category_name for expense, _ in rows}, user_id
+            )
+            self._insert_transactions([
+                {
+                    "amount": expense.amount,
+                    "description": expense.description,
+                    "date": date,
+                    "category_id": category_ids[expense.category_name],
+                    "user_id": user_id,
+                    "payment_method": expense.payment_method
+                }
+                for expense, date in rows
+            ])
+        self.db.commit()
+
+        return {
+            "inserted": len(rows),
+            "duplicates": duplicates,
+            "future": future,
+            "undated": undated,
+            "categories_created": categories_created
+        }
+
+    def _resolve_category_ids(self, names: Iterable[str], user_id: int) -> Tuple[Dict[str, int], int]:
+        """
+        Maps category names to ids for the user via the cached category map, creating the missing ones in a
+        single INSERT. ON CONFLICT DO NOTHING on uq_categories_user_id_name makes concurrent creates safe:
+        names another request inserted first are read back instead of failing the transaction.
+        """
+        names = set(names)
+        category_ids = {
+            name: category_id
+            for category_id, name in get_category_map(self.db, user_id).items()
+            if name in names
+        }
+
+        missing = sorted(names - category_ids.keys())
+        if not missing:
+            return category_ids, 0
+
+        created = dict(self.db.execute(
+            self._insert_categories_ignoring_conflicts()
+            .values([{"name": name, "type": "expense", "user_id": user_id} for name in missing])
+            .returning(CategoryModel.name, CategoryModel.id)
+        ).all())
+        category_ids.update(created)
+
+        raced = [name for name in missing if name not in created]
+        if raced:
+            category_ids.update(self.db.query(CategoryModel.name, CategoryModel.id).filter(
+                CategoryModel.user_id == user_id,
+                CategoryModel.name.in_(raced)
+            ).all())
+
+        invalidate_category_map(user_id)
+        return category_ids, len(created)
+
+    def _insert_categories_ignoring_conflicts(self):
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return postgresql_insert(CategoryModel).on_conflict_do_nothing(index_elements=["user_id", "name"])
+        if dialect == "sqlite":
+            return sqlite_insert(CategoryModel).on_conflict_do_nothing(index_elements=["user_id", "name"])
+        return insert(CategoryModel)
+
+    def _insert_transactions(self, rows: List[dict]):
+        """executemany over the whole batch; SQLAlchemy packs it into multi-row INSERT statements."""
+        if rows:
+            self.db.execute(insert(TransactionModel), rows)
+
     def get_expenses(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ExpenseResponse]:
         try:
             expenses = self.db.query(TransactionModel).filter(
                 TransactionModel.user_id == user_id
             ).order_by(TransactionModel.date.desc()).offset(skip).limit(limit).all()
 
+            category_map = get_category_map(self.db, user_id, {expense.category_id for expense in expenses})
             expense_responses = []
             for expense in expenses:
-                category = self.db.query(CategoryModel).filter(CategoryModel.id == expense.category_id).first()
                 expense_responses.append(ExpenseResponse(
                     id=expense.id,
                     amount=expense.amount,
                     description=expense.description,
                     date=expense.date,
-                    category_name=category.name if category else "Unknown",
+                    category_name=category_map.get(expense.category_id, "Unknown"),
                     payment_method=expense.payment_method if expense.payment_method is not None else "Unknown"
                 ))
 
@@ -156,6 +427,7 @@ class ExpenseService(IExpenseService):
             self.db.add(db_category)
             self.db.commit()
             self.db.refresh(db_category)
+            invalidate_category_map(user_id)
 
             logger_message = f"Category '{category.name}' added successfully"
             self._log(user_id,
@@ -332,27 +604,24 @@ class ExpenseService(IExpenseService):
     #Helper Method
     def get_previous_month_expenses(self, user_id: int, skip: int = 0, limit: int = 100) -> List[ExpenseResponse]:
         try:
-            last_day_prev_month = datetime.now().replace(day=1) - timedelta(days=1)
-            prev_month_number = last_day_prev_month.month
-            prev_year_number = last_day_prev_month.year
-
-            expenses = self.db.query(TransactionModel).filter(
+            start, end = previous_month_range()
+
+            expenses = self.db.query(
+                TransactionModel.id,
+                TransactionModel.amount,
+                TransactionModel.description,
+                TransactionModel.date,
+                TransactionModel.payment_method,
+                CategoryModel.name.label("category_name")
+            ).outerjoin(
+                CategoryModel, CategoryModel.id == TransactionModel.category_id
+            ).filter(
                 TransactionModel.user_id == user_id,
-                extract('month', TransactionModel.date) == prev_month_number,
-                extract('year', TransactionModel.date) == prev_year_number
+                TransactionModel.date >= start,
+                TransactionModel.date < end
             ).order_by(TransactionModel.date.desc()).offset(skip).limit(limit).all()
 
-            expense_responses = []
-            for expense in expenses:
-                category = self.db.query(CategoryModel).filter(CategoryModel.id == expense.category_id).first()
-                expense_responses.append(ExpenseResponse(
-                    id=expense.id,
-                    amount=expense.amount,
-                    description=expense.description,
-                    date=expense.date,
-                    category_name=category.name if category else "Unknown",
-                    payment_method=expense.payment_method if expense.payment_method is not None else "Unknown"
-                ))
+            expense_responses = [self._to_expense_response(expense) for expense in expenses]
 
             logger_message = f"Retrieved {len(expense_responses)} expenses, skip: {skip}, limit: {limit}"
             self.file_and_db_handler_log.file_logger(
@@ -374,3 +643,151 @@ class ExpenseService(IExpenseService):
                 user_id=user_id
             )
             raise ex
+
+    #Helper Method
+    def stream_previous_month_expenses_by_subscriber(
+            self,
+            subscriber_ids: List[int],
+            limit_per_user: int = 1000) -> Iterator[Tuple[int, int, List[ExpenseResponse]]]:
+        """
+        Yields (subscriber_id, user_id, expenses) for every given subscriber that has a matching user.
+        subscribers -> users -> transactions -> categories are read in a single streamed query ordered
+        by subscriber, so there is no per-user round trip. Subscribers without a user are not yielded.
+        """
+        if not subscriber_ids:
+            return
+
+        start, end = previous_month_range()
+
+        rows = self.db.query(
+            SubscriberModel.id.label("subscriber_id"),
+            UserModel.id.label("user_id"),
+            TransactionModel.id,
+            TransactionModel.amount,
+            TransactionModel.description,
+            TransactionModel.date,
+            TransactionModel.payment_method,
+            CategoryModel.name.label("category_name")
+        ).join(
+            UserModel, UserModel.email == SubscriberModel.email
+        ).outerjoin(
+            TransactionModel, and_(
+                TransactionModel.user_id == UserModel.id,
+                TransactionModel.date >= start,
+                TransactionModel.date < end
+            )
+        ).outerjoin(
+            CategoryModel, CategoryModel.id == TransactionModel.category_id
+        ).filter(
+            SubscriberModel.id.in_(subscriber_ids)
+        ).order_by(
+            SubscriberModel.id, TransactionModel.date.desc()
+        ).yield_per(1000)
+
+        for (subscriber_id, user_id), group in groupby(rows, key=lambda row: (row.subscriber_id, row.user_id)):
+            expenses = [
+                self._to_expense_response(row)
+                for row in islice(group, limit_per_user)
+                if row.id is not None  # subscriber without transactions last month
+            ]
+            yield subscriber_id, user_id, expenses
+
+    @staticmethod
+    def _to_expense_response(row) -> ExpenseResponse:
+        return ExpenseResponse(
+            id=row.id,
+            amount=row.amount,
+            description=row.description,
+            date=row.date,
+            category_name=row.category_name if row.category_name else "Unknown",
+            payment_method=row.payment_method if row.payment_method is not None else "Unknown"
+        )
+
+    def export_expenses(self, user_id: int, username: str, export_format: str) -> StreamingResponse:
+        if export_format not in EXPORT_MEDIA_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported export format '{export_format}'"
+            )
+
+        body = self.iter_expenses_csv(user_id) if export_format == "csv" else self.iter_expenses_ndjson(user_id)
+
+        self.file_and_db_handler_log.file_logger(
+            loglevel="INFO",
+            message=f"Expenses export started, format: {export_format}",
+            event_source="ExpenseService.ExportExpenses",
+            exception="NULL",
+            user_id=user_id
+        )
+
+        return StreamingResponse(
+            body,
+            media_type=EXPORT_MEDIA_TYPES[export_format],
+            headers={
+                "Content-Disposition": f"attachment; filename=Expenses_{username}.{export_format}"
+            },
+        )
+
+    def iter_expenses_csv(self, user_id: int) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for count, row in enumerate(self._iter_export_rows(user_id), start=1):
+            writer.writerow([
+                row.id,
+                row.date.isoformat() if row.date else "",
+                row.amount,
+                row.description or "",
+                row.category_name or "Unknown",
+                row.payment_method or "Unknown"
+            ])
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+
+    def iter_expenses_ndjson(self, user_id: int) -> Iterator[bytes]:
+        lines = []
+        for row in self._iter_export_rows(user_id):
+            lines.append(json.dumps({
+                "id": row.id,
+                "date": row.date.isoformat() if row.date else None,
+                # A string, like the CSV export, so the exact NUMERIC(14, 2) value survives JSON number parsing
+                "amount": str(row.amount),
+                "description": row.description,
+                "category_name": row.category_name or "Unknown",
+                "payment_method": row.payment_method or "Unknown"
+            }))
+            if len(lines) == EXPORT_BATCH_SIZE:
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+                lines = []
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def _iter_export_rows(self, user_id: int):
+        """
+        Streams the user's full history through a server-side cursor. The response body is consumed after
+        the request's session has been handed back, so the export reads on a session of its own.
+        """
+        session = Session(bind=self.db.get_bind())
+        try:
+            rows = session.query(
+                TransactionModel.id,
+                TransactionModel.date,
+                TransactionModel.amount,
+                TransactionModel.description,
+                TransactionModel.payment_method,
+                CategoryModel.name.label("category_name")
+            ).outerjoin(
+                CategoryModel, CategoryModel.id == TransactionModel.category_id
+            ).filter(
+                TransactionModel.user_id == user_id
+            ).order_by(
+                TransactionModel.date.desc(), TransactionModel.id.desc()
+            ).yield_per(EXPORT_BATCH_SIZE)
+
+            for row in rows:
+                yield row
+        finally:
+            session.close()
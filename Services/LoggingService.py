@@ -1,19 +1,70 @@
-from sqlalchemy import or_
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import or_, and_, tuple_
 from sqlalchemy.orm import Session
+from starlette import status
 from Models.Table.Logging import Logging as LoggingModel
 from Interfaces.ILoggingService import ILoggingService
 from Schema.LoggingSchema import GetUserAuthLogsResponse, SelectedLogging
 
+AUTH_LOG_ACTIONS = {
+    "AuthService": ["Login", "LoginCodeAndOTP"],
+}
+
+# event_category -> event_actions shown in the user's activity log
+SELECTED_LOG_ACTIONS = {
+    "AuthService": ["Login", "RegisterCodeAndOTP", "LoginCodeAndOTP", "DeleteAccount", "Register",
+                    "ChangePassword", "UpdateProfile", "AccountReActive"],
+    "ExpenseService": ["AddCategory", "EditExpenseList", "AddExpense", "AddExpensesBulk", "ImportExpenses",
+                       "DeleteExpenseListItem"],
+    "BudgetService": ["AddBudget", "DeleteSetBudget", "EditBudgetAmount"],
+}
+
+
+def encode_log_cursor(log: LoggingModel) -> str:
+    return base64.urlsafe_b64encode(f"{log.created_at.isoformat()}|{log.id}".encode()).decode()
+
+
+def decode_log_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(log_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
 
 class LoggingService(ILoggingService):
     def __init__(self, db: Session):
         self.db = db
 
-    def get_user_auth_logs(self, user_id: int, user_email: str):
-        result = []
-        logs = self.db.query(LoggingModel).filter(
+    def _page(self, user_id: int, actions: dict, limit: int, cursor: Optional[str]) -> Tuple[List[LoggingModel], Optional[str]]:
+        """
+        One newest-first page of the user's logs matching {event_category: [event_action, ...]}, served by
+        ix_logging_user_id_event_category_created_at. Returns the rows and the cursor of the next page.
+        """
+        query = self.db.query(LoggingModel).filter(
             LoggingModel.user_id == user_id,
-            LoggingModel.event_source.startswith("AuthService.Login")).all()
+            or_(*(
+                and_(LoggingModel.event_category == category, LoggingModel.event_action.in_(category_actions))
+                for category, category_actions in actions.items()
+            ))
+        )
+        if cursor:
+            created_at, log_id = decode_log_cursor(cursor)
+            query = query.filter(tuple_(LoggingModel.created_at, LoggingModel.id) < (created_at, log_id))
+
+        logs = query.order_by(LoggingModel.created_at.desc(), LoggingModel.id.desc()).limit(limit + 1).all()
+        if len(logs) > limit:
+            logs = logs[:limit]
+            return logs, encode_log_cursor(logs[-1])
+        return logs, None
+
+    def get_user_auth_logs(self, user_id: int, user_email: str, limit: int = 50, cursor: str = None):
+        result = []
+        logs, next_cursor = self._page(user_id, AUTH_LOG_ACTIONS, limit, cursor)
 
         for log in logs:
             response = GetUserAuthLogsResponse(
@@ -25,42 +76,19 @@ class LoggingService(ILoggingService):
 
             result.append(response)
 
-        return result
+        return result, next_cursor
 
-    def return_selected_logging(self, user_id: int, user_email: str):
+    def return_selected_logging(self, user_id: int, user_email: str, limit: int = 50, cursor: str = None):
         result = []
-        select_logs = (self.db.query(LoggingModel)
-        .filter(
-            LoggingModel.user_id == user_id,
-            or_(
-                LoggingModel.event_source.startswith("AuthService.Login"),
-                LoggingModel.event_source.startswith("AuthService.RegisterCodeAndOTP"),
-                LoggingModel.event_source.startswith("AuthService.LoginCodeAndOTP"),
-                LoggingModel.event_source.startswith("AuthService.DeleteAccount"),
-                LoggingModel.event_source.startswith("AuthService.Register"),
-                LoggingModel.event_source.startswith("AuthService.ChangePassword"),
-                LoggingModel.event_source.startswith("AuthService.UpdateProfile"),
-                LoggingModel.event_source.startswith("ExpenseService.AddCategory"),
-                LoggingModel.event_source.startswith("BudgetService.AddBudget"),
-                LoggingModel.event_source.startswith("BudgetService.DeleteSetBudget"),
-                LoggingModel.event_source.startswith("ExpenseService.EditExpenseList"),
-                LoggingModel.event_source.startswith("BudgetService.EditBudgetAmount"),
-                LoggingModel.event_source.startswith("ExpenseService.AddExpense"),
-                LoggingModel.event_source.startswith("ExpenseService.DeleteExpenseListItem"),
-                LoggingModel.event_source.startswith("AuthService.AccountReActive"),
-
-            )
-            ).all()
-                       )
+        select_logs, next_cursor = self._page(user_id, SELECTED_LOG_ACTIONS, limit, cursor)
 
         for log in select_logs:
-            log_source = log.event_source.split(".")[1]
             response = SelectedLogging(
-                source = log_source,
+                source = log.event_action,
                 email=user_email,
                 message=log.message,
                 ip_address=log.ip_address,
                 datetime=log.created_at,
             )
             result.append(response)
-        return result
\ No newline at end of file
+        return result, next_cursor
@@ -1,17 +1,388 @@
-import zlib
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
+from tempfile import SpooledTemporaryFile, NamedTemporaryFile
 from fastapi import HTTPException
 from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from datetime import datetime
-from requests import Session
+from decimal import Decimal
+from sqlalchemy.orm import Session
 from starlette import status
-from starlette.responses import Response
+from starlette.responses import StreamingResponse, Response
+from Cache.RedisCache import get_version
 from Interfaces.IPdfService import IPdfService
 from Logging.Helper.FileandDbLogHandler import FileandDbHandlerLog
-from Services.ExpenseService import ExpenseService
+from Monitoring.Tracing import traced
+from Services.ExpenseService import ExpenseService, expense_data_version_key
+
+# PDFs up to this size stay in memory, bigger ones roll over to a temp file on disk
+PDF_SPOOL_MAX_SIZE = 1024 * 1024
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+# "inline" renders on the request thread, "process" renders in a bounded ProcessPoolExecutor
+PDF_EXECUTION_MODE = os.getenv("PDF_EXECUTION_MODE", "inline").lower()
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", os.cpu_count() or 2))
+# Renders queued or running at once; further requests get a 503 instead of tying up a threadpool thread
+PDF_POOL_MAX_PENDING = int(os.getenv("PDF_POOL_MAX_PENDING", PDF_POOL_WORKERS * 2))
+PDF_POOL_TIMEOUT = float(os.getenv("PDF_POOL_TIMEOUT", 120))
+PDF_POOL_RETRY_AFTER = os.getenv("PDF_POOL_RETRY_AFTER", "5")
+
+# Finished PDFs are kept on local disk, keyed by user, page and expense data version
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "expense_pdf_cache"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Cache keys roll over every PDF_CACHE_MAX_AGE seconds, bounding how long a report can outlive a missed version bump
+PDF_CACHE_MAX_AGE = int(os.getenv("PDF_CACHE_MAX_AGE", 3600))
+
+# "table" lays the report out with a platypus Table, "canvas" draws rows page by page with fixed column widths
+PDF_RENDERER = os.getenv("PDF_RENDERER", "table").lower()
+
+REPORT_TITLE = "ExpenseTracker Report"
+REPORT_WEBSITE = "https://expense-tracker-fast-api.vercel.app/"
+REPORT_HEADERS = ["Date", "Description", "Category", "Payment Method", "Amount (PKR)"]
+
+# Canvas layout, in points. Column widths add up to the A4 width minus the page margins.
+CANVAS_COLUMN_WIDTHS = [70, 185, 100, 95, 85]
+CANVAS_ROW_HEIGHT = 16
+CANVAS_FONT_SIZE = 9
+CANVAS_CELL_PADDING = 4
+CANVAS_MARGINS = {"left": 30, "right": 30, "top": 40, "bottom": 30}
+
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+_pdf_pool_slots = threading.BoundedSemaphore(PDF_POOL_MAX_PENDING)
+
+
+def _iter_file(file, chunk_size: int = PDF_STREAM_CHUNK_SIZE, delete: bool = False):
+    try:
+        while chunk := file.read(chunk_size):
+            yield chunk
+    finally:
+        file.close()
+        if delete:
+            os.remove(file.name)
+
+
+def expense_rows(expenses):
+    """
+    Flattens ExpenseResponse objects into (date, description, category, payment method, amount) tuples.
+    Amounts become Decimal again (the API schema carries them as float) so the report total is exact.
+    """
+    for expense in expenses:
+        yield (
+            expense.date.strftime("%Y-%m-%d"),
+            expense.description,
+            expense.category_name,
+            expense.payment_method,
+            Decimal(str(expense.amount))
+        )
+
+
+def _render_table_pdf(rows, output):
+    pdf = SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        pageCompression=1,
+        leftMargin=30,
+        rightMargin=30,
+        topMargin=40,
+        bottomMargin=30
+    )
+    elements = []
+    styles = getSampleStyleSheet()
+
+    title = Paragraph(REPORT_TITLE, styles["Title"])
+    elements.append(title)
+    elements.append(Spacer(1, 12))
+
+    website_text = f'<a href="{REPORT_WEBSITE}" color="blue">ExpenseTracker.com</a>'
+    website = Paragraph(website_text, styles["Normal"])
+    elements.append(website)
+    elements.append(Spacer(1, 12))
+
+    date_info = Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles["Normal"])
+    elements.append(date_info)
+    elements.append(Spacer(1, 12))
+
+    data = [list(REPORT_HEADERS)]
+    total_amount = Decimal(0)
+
+    for date, description, category_name, payment_method, amount in rows:
+        data.append([
+            date,
+            description,
+            category_name,
+            payment_method,
+            f"{amount:,.2f}"
+        ])
+
+        total_amount += amount
+
+    data.append(["", "", "", Paragraph("<b>Total Spent</b>", styles["Normal"]), f"{total_amount:,.2f}"])
+
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('BACKGROUND', (0, 1), (-1, -2), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('ALIGN', (-1, 1), (-1, -1), 'RIGHT'),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.beige),
+        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ]))
+
+    elements.append(table)
+    pdf.build(elements)
+
+
+def _fit_text(text: str, font_name: str, width: float) -> str:
+    text = "" if text is None else str(text)
+    if stringWidth(text, font_name, CANVAS_FONT_SIZE) <= width:
+        return text
+    ellipsis = "..."
+    # Binary search for the longest prefix that fits with the ellipsis: log(n) width measurements, not n
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if stringWidth(text[:middle] + ellipsis, font_name, CANVAS_FONT_SIZE) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + ellipsis
+
+
+def _draw_canvas_row(pdf, y: float, cells: list, font_name: str, background):
+    x = CANVAS_MARGINS["left"]
+    pdf.setFont(font_name, CANVAS_FONT_SIZE)
+    text_y = y + (CANVAS_ROW_HEIGHT - CANVAS_FONT_SIZE) / 2 + 1
+    for index, (cell, width) in enumerate(zip(cells, CANVAS_COLUMN_WIDTHS)):
+        pdf.setFillColor(background)
+        pdf.rect(x, y, width, CANVAS_ROW_HEIGHT, stroke=1, fill=1)
+        pdf.setFillColor(colors.black)
+        text = _fit_text(cell, font_name, width - 2 * CANVAS_CELL_PADDING)
+        if index == len(cells) - 1:
+            pdf.drawRightString(x + width - CANVAS_CELL_PADDING, text_y, text)
+        else:
+            pdf.drawCentredString(x + width / 2, text_y, text)
+        x += width
+
+
+def _render_canvas_pdf(rows, output):
+    """Draws rows straight onto the page, starting a new page whenever the current one is full, so
+    memory and time stay linear in the number of rows."""
+    page_width, page_height = A4
+    top = page_height - CANVAS_MARGINS["top"]
+    bottom = CANVAS_MARGINS["bottom"]
+
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    pdf.setTitle(REPORT_TITLE)
+    pdf.setStrokeColor(colors.grey)
+    pdf.setLineWidth(0.25)
+
+    y = top - 18
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawCentredString(page_width / 2, y, REPORT_TITLE)
+    y -= 30
+    pdf.setFont("Helvetica", 10)
+    pdf.setFillColor(colors.blue)
+    pdf.drawString(CANVAS_MARGINS["left"], y, "ExpenseTracker.com")
+    pdf.linkURL(REPORT_WEBSITE, (CANVAS_MARGINS["left"], y - 2, CANVAS_MARGINS["left"] + 100, y + 10))
+    pdf.setFillColor(colors.black)
+    y -= 24
+    pdf.drawString(CANVAS_MARGINS["left"], y, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    y -= 12 + CANVAS_ROW_HEIGHT
+
+    _draw_canvas_row(pdf, y, REPORT_HEADERS, "Helvetica", colors.lightgrey)
+    total_amount = Decimal(0)
+
+    for date, description, category_name, payment_method, amount in rows:
+        y -= CANVAS_ROW_HEIGHT
+        if y < bottom:
+            pdf.showPage()
+            pdf.setStrokeColor(colors.grey)
+            pdf.setLineWidth(0.25)
+            y = top - CANVAS_ROW_HEIGHT
+            _draw_canvas_row(pdf, y, REPORT_HEADERS, "Helvetica", colors.lightgrey)
+            y -= CANVAS_ROW_HEIGHT
+        _draw_canvas_row(pdf, y, [date, description, category_name, payment_method, f"{amount:,.2f}"],
+                         "Helvetica", colors.whitesmoke)
+        total_amount += amount
+
+    y -= CANVAS_ROW_HEIGHT
+    if y < bottom:
+        pdf.showPage()
+        pdf.setStrokeColor(colors.grey)
+        pdf.setLineWidth(0.25)
+        y = top - CANVAS_ROW_HEIGHT
+    _draw_canvas_row(pdf, y, ["", "", "", "Total Spent", f"{total_amount:,.2f}"], "Helvetica-Bold", colors.beige)
+
+    pdf.save()
+
+
+def render_expenses_pdf(rows, output, renderer: str = None):
+    """Renders expense row tuples (see expense_rows) into the writable file object output."""
+    renderer = (renderer or PDF_RENDERER).lower()
+    if renderer == "canvas":
+        _render_canvas_pdf(rows, output)
+    elif renderer == "table":
+        _render_table_pdf(rows, output)
+    else:
+        raise ValueError(f"Unknown PDF renderer '{renderer}'")
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # spawn keeps workers independent of the server's threads, sockets and DB connections
+            _pdf_pool = ProcessPoolExecutor(
+                max_workers=PDF_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pdf_pool
+
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor):
+    """Drops a pool whose worker died (e.g. OOM-killed), so the next export starts a fresh one."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _discard_render(future):
+    """Removes the temp file of a render nobody is waiting for any more."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        os.remove(future.result())
+    except OSError:
+        pass
+
+
+def _render_to_temp_file(rows: list, renderer: str, directory: str = None) -> str:
+    """Runs inside a pool worker (or inline). Only the temp file path travels back, not the PDF bytes."""
+    with NamedTemporaryFile(suffix=".pdf", delete=False, dir=directory) as output:
+        try:
+            render_expenses_pdf(rows, output, renderer)
+        except Exception:
+            output.close()
+            os.remove(output.name)
+            raise
+        return output.name
+
+
+def _pdf_cache_etag(user_id: int, skip: int, limit: int, version: str, renderer: str) -> str:
+    period = int(time.time() // PDF_CACHE_MAX_AGE)
+    digest = hashlib.sha256(f"{user_id}:{skip}:{limit}:{version}:{renderer}:{period}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _pdf_cache_path(etag: str) -> str:
+    return os.path.join(PDF_CACHE_DIR, f"{etag.strip(chr(34))}.pdf")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _evict_pdf_cache():
+    """
+    Deletes cached PDFs not used for PDF_CACHE_MAX_AGE (their keys have rolled over), then the least
+    recently used ones until the cache fits in PDF_CACHE_MAX_BYTES.
+    """
+    try:
+        entries = [entry for entry in os.scandir(PDF_CACHE_DIR) if entry.name.endswith(".pdf")]
+        stats = sorted(((entry.stat(), entry.path) for entry in entries), key=lambda item: item[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in stats)
+        expired_before = time.time() - PDF_CACHE_MAX_AGE
+        for stat, path in stats:
+            if total <= PDF_CACHE_MAX_BYTES and stat.st_mtime >= expired_before:
+                break
+            os.remove(path)
+            total -= stat.st_size
+    except OSError as e:
+        print("PDF cache eviction error:", e)
+
+
+@traced("pdf.render_in_pool")
+def render_expenses_pdf_in_pool(rows: list, renderer: str = None) -> str:
+    """
+    Renders row tuples in the PDF process pool and returns the path of the finished temp file,
+    which the caller must remove. Raises a 503 when PDF_POOL_MAX_PENDING renders are already in flight.
+    """
+    if not _pdf_pool_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF export is busy, please try again shortly",
+            headers={"Retry-After": PDF_POOL_RETRY_AFTER}
+        )
+    abandoned = threading.Event()
+
+    def _render_done(done_future):
+        # Runs once the worker is really finished: a timed-out render holds its slot until then
+        _pdf_pool_slots.release()
+        if abandoned.is_set():
+            _discard_render(done_future)
+
+    pool = None
+    try:
+        pool = _get_pdf_pool()
+        future = pool.submit(_render_to_temp_file, rows, (renderer or PDF_RENDERER).lower())
+    except BrokenProcessPool:
+        _pdf_pool_slots.release()
+        _reset_pdf_pool(pool)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF export failed, please try again shortly",
+            headers={"Retry-After": PDF_POOL_RETRY_AFTER}
+        )
+    except Exception:
+        _pdf_pool_slots.release()
+        raise
+    future.add_done_callback(_render_done)
+
+    try:
+        return future.result(timeout=PDF_POOL_TIMEOUT)
+    except FutureTimeoutError:
+        # cancel() can't stop a render that has started; its file is removed when it finishes instead
+        abandoned.set()
+        if future.done():
+            # Finished between the timeout and the flag, after _render_done had already run
+            _discard_render(future)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF export timed out, please try again shortly",
+            headers={"Retry-After": PDF_POOL_RETRY_AFTER}
+        )
+    except BrokenProcessPool:
+        _reset_pdf_pool(pool)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PDF export failed, please try again shortly",
+            headers={"Retry-After": PDF_POOL_RETRY_AFTER}
+        )
+
 
 class PdfService(IPdfService):
     def __init__(self, db: Session, expense_service: ExpenseService):
@@ -27,22 +398,75 @@ class PdfService(IPdfService):
             loglevel=level, message=message, event_source=source, exception=exception, user_id=user_id
         )
 
+    @traced("pdf.download")
     def download_expenses_pdf(
             self,
             user_id: int,
             username: str,
             skip: int = 0,
-            limit: int = 1000):
+            limit: int = 1000,
+            if_none_match: str = None):
+        """
+        Streams the expense report. When the user's expense data version is known the PDF is cached on
+        disk under a content key that doubles as the ETag, so repeat downloads are served from the cache
+        or answered with 304 when the client already holds that version.
+        """
         try:
+            headers = {"Content-Disposition": f"attachment; filename=Expenses_Report_{username}.pdf"}
+            renderer = PDF_RENDERER
+
+            # Without a data version (Redis unavailable) there is no safe cache key, so always rebuild. A version
+            # bump missed during an outage resets the key once Redis is back, and PDF_CACHE_MAX_AGE bounds the rest
+            version = get_version(expense_data_version_key(user_id))
+            etag = _pdf_cache_etag(user_id, skip, limit, version, renderer) if version is not None else None
+            if etag:
+                headers["ETag"] = etag
+                headers["Cache-Control"] = "private, no-cache"
+                if _etag_matches(if_none_match, etag):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+                cache_path = _pdf_cache_path(etag)
+                if os.path.exists(cache_path):
+                    try:
+                        os.utime(cache_path)
+                        pdf_file = open(cache_path, "rb")
+                    except OSError:
+                        pass  # evicted in between, rebuild below
+                    else:
+                        headers["Content-Length"] = str(os.fstat(pdf_file.fileno()).st_size)
+                        return StreamingResponse(_iter_file(pdf_file), media_type="application/pdf", headers=headers)
+
             expenses = self.expense_service.get_expenses(user_id, skip, limit)
-            pdf_buffer = self.generate_expenses_pdf(expenses)
-            return Response(
-                content=pdf_buffer.getvalue(),
-                media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f"attachment; filename=Expenses_Report_{username}.pdf"
-                },
-            )
+
+            if etag:
+                os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+                if PDF_EXECUTION_MODE == "process":
+                    pdf_path = render_expenses_pdf_in_pool(list(expense_rows(expenses)), renderer)
+                else:
+                    pdf_path = _render_to_temp_file(expense_rows(expenses), renderer, PDF_CACHE_DIR)
+                shutil.move(pdf_path, cache_path)
+                pdf_file = open(cache_path, "rb")
+                size = os.fstat(pdf_file.fileno()).st_size
+                body = _iter_file(pdf_file)
+                _evict_pdf_cache()
+            elif PDF_EXECUTION_MODE == "process":
+                pdf_path = render_expenses_pdf_in_pool(list(expense_rows(expenses)), renderer)
+                pdf_file = open(pdf_path, "rb")
+                size = os.path.getsize(pdf_path)
+                body = _iter_file(pdf_file, delete=True)
+            else:
+                pdf_file = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE, mode="w+b")
+                try:
+                    self.generate_expenses_pdf(expenses, output=pdf_file, renderer=renderer)
+                    size = pdf_file.seek(0, os.SEEK_END)
+                    pdf_file.seek(0)
+                except Exception:
+                    pdf_file.close()
+                    raise
+                body = _iter_file(pdf_file)
+
+            headers["Content-Length"] = str(size)
+            return StreamingResponse(body, media_type="application/pdf", headers=headers)
         except Exception as ex:
             code = getattr(ex, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
             if isinstance(ex, HTTPException):
@@ -53,79 +477,24 @@ class PdfService(IPdfService):
                 detail=str(ex)
             )
 
-    def generate_expenses_pdf(self, expenses: list):
+    @traced("pdf.generate")
+    def generate_expenses_pdf(self, expenses: list, output=None, renderer: str = None):
+        """Renders the report into output (a BytesIO by default) and returns it rewound to the start.
+        renderer is "table" or "canvas" and defaults to the PDF_RENDERER setting."""
         try:
-            buffer = BytesIO()
-            pdf = SimpleDocTemplate(
-                buffer,
-                pagesize=A4,
-                leftMargin=30,
-                rightMargin=30,
-                topMargin=40,
-                bottomMargin=30
-            )
-            elements = []
-            styles = getSampleStyleSheet()
-
-            title = Paragraph("ExpenseTracker Report", styles["Title"])
-            elements.append(title)
-            elements.append(Spacer(1, 12))
-
-            website_text = '<a href="https://expense-tracker-fast-api.vercel.app/" color="blue">ExpenseTracker.com</a>'
-            website = Paragraph(website_text, styles["Normal"])
-            elements.append(website)
-            elements.append(Spacer(1, 12))
-
-            date_info = Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles["Normal"])
-            elements.append(date_info)
-            elements.append(Spacer(1, 12))
-
-            data = [["Date", "Description", "Category", "Payment Method", "Amount (PKR)"]]
-            total_amount = 0.0
-
-            for expense in expenses:
-                data.append([
-                    expense.date.strftime("%Y-%m-%d"),
-                    expense.description,
-                    expense.category_name,
-                    expense.payment_method,
-                    f"{expense.amount:,.2f}"
-                ])
-
-                total_amount += expense.amount
-
-            data.append(["", "", "", Paragraph("<b>Total Spent</b>", styles["Normal"]), f"{total_amount:,.2f}"])
-
-            table = Table(data, repeatRows=1)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-                ('BACKGROUND', (0, 1), (-1, -2), colors.whitesmoke),
-                ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-                ('ALIGN', (-1, 1), (-1, -1), 'RIGHT'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.beige),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ]))
-
-            elements.append(table)
-            pdf.build(elements)
+            buffer = output if output is not None else BytesIO()
+            if PDF_EXECUTION_MODE == "process":
+                pdf_path = render_expenses_pdf_in_pool(list(expense_rows(expenses)), renderer)
+                try:
+                    with open(pdf_path, "rb") as pdf_file:
+                        shutil.copyfileobj(pdf_file, buffer)
+                finally:
+                    os.remove(pdf_path)
+            else:
+                render_expenses_pdf(expense_rows(expenses), buffer, renderer)
             buffer.seek(0)
-            pdf_data = buffer.read()
-
-            max_size = 500 * 1024
-            if len(pdf_data) > max_size:
-                compressed_data = zlib.compress(pdf_data, level=9)
-                if len(compressed_data) < max_size:
-                    pdf_data = compressed_data  # Use compressed version
 
-            output = BytesIO(pdf_data)
-            output.seek(0)
-
-            return output
+            return buffer
 
         except Exception as ex:
             code = getattr(ex, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -135,4 +504,4 @@ class PdfService(IPdfService):
             raise HTTPException(
                 status_code=code,
                 detail=str(ex)
-            )
\ No newline at end of file
+            )
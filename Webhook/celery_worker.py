@@ -1,15 +1,31 @@
 from celery import Celery
+from celery.schedules import crontab
 import os
+from Models.Database import engine
+from Monitoring.Tracing import trace_celery, trace_engine
 
 redis_url = os.getenv("UPSTASH_REDIS_URL")
 
 celery_app = Celery(
     "expense_report_tasks",
     broker=redis_url,
-    backend=redis_url
+    backend=redis_url,
+    include=["Webhook.pdf_tasks", "Webhook.import_tasks", "Webhook.logging_tasks"]
 )
 
 celery_app.conf.update(
     timezone="UTC",
     broker_connection_retry_on_startup=True,
 )
+
+#OpenTelemetry spans per task and SQL statement (TRACING_ENABLED=true)
+trace_celery()
+trace_engine(engine)
+
+# Run with `celery -A Webhook.celery_worker beat` next to the worker
+celery_app.conf.beat_schedule = {
+    "archive-old-logs": {
+        "task": "archive_old_logs",
+        "schedule": crontab(hour=3, minute=15),
+    },
+}
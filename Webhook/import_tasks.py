@@ -0,0 +1,101 @@
+import os
+import uuid
+from itertools import islice
+from typing import Optional
+from fastapi import HTTPException
+from starlette import status
+from Cache.CategoryCache import categories_cache_key
+from Cache.RedisCache import clear_cache_by_pattern, bump_version, delete_cache
+from Logging.Helper.FileandDbLogHandler import FileandDbHandlerLog
+from Models.Database import SessionLocal
+from Services.ExpenseService import ExpenseService, parse_expenses_csv, expense_data_version_key
+from Webhook.celery_worker import celery_app
+
+# Rows inserted per database transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 2000))
+
+
+def import_task_id(user_id: int) -> str:
+    """Task ids carry their owner, so import status can be checked in every state, failures included."""
+    return f"import-{user_id}-{uuid.uuid4()}"
+
+
+def import_task_owner(task_id: str) -> Optional[int]:
+    prefix, _, rest = task_id.partition("-")
+    owner, _, _ = rest.partition("-")
+    return int(owner) if prefix == "import" and owner.isdigit() else None
+
+
+def _report_progress(task, progress: dict):
+    # update_state needs a task id, which only exists when running inside a worker
+    if task.request.id:
+        task.update_state(state="PROGRESS", meta=progress)
+
+
+@celery_app.task(bind=True, name="import_expenses_csv")
+def import_expenses_csv(self, user_id: int, path: str):
+    """
+    Imports a spooled bank-statement CSV in chunks of IMPORT_CHUNK_SIZE rows, one commit per chunk.
+    Already imported rows are de-duplicated, so a failed import can simply be uploaded again.
+    """
+    db = SessionLocal()
+    progress = {
+        "user_id": user_id,
+        "processed": 0,
+        "inserted": 0,
+        "duplicates": 0,
+        "future": 0,
+        "undated": 0,
+        "categories_created": 0
+    }
+    try:
+        expense_service = ExpenseService(db)
+        seen = set()
+        _report_progress(self, progress)
+
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            expenses = parse_expenses_csv(file)
+            while chunk := list(islice(expenses, IMPORT_CHUNK_SIZE)):
+                result = expense_service.import_expenses_chunk(chunk, user_id, seen)
+                progress["processed"] += len(chunk)
+                for key, value in result.items():
+                    progress[key] += value
+                _report_progress(self, progress)
+
+        FileandDbHandlerLog(db).db_logger(
+            loglevel="INFO",
+            message=f"Imported {progress['inserted']} of {progress['processed']} expenses from CSV, "
+                    f"{progress['duplicates']} duplicates and {progress['undated']} undated rows skipped",
+            event_source="ExpenseService.ImportExpenses",
+            exception="NULL",
+            user_id=user_id
+        )
+        return progress
+    except Exception as ex:
+        db.rollback()
+        code = getattr(ex, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if isinstance(ex, HTTPException):
+            raise ex
+
+        raise HTTPException(
+            status_code=code,
+            detail=str(ex)
+        )
+    finally:
+        # Chunks committed before a failure are kept, so caches are invalidated either way
+        if progress["inserted"]:
+            clear_cache_by_pattern(f"analytics:*:{user_id}*")
+            clear_cache_by_pattern(f"expenses:{user_id}:*")
+            if not bump_version(expense_data_version_key(user_id)):
+                FileandDbHandlerLog(db).file_logger(
+                    loglevel="WARNING",
+                    message="Expense data version not bumped, Redis unavailable; cached PDFs refresh once it is back",
+                    event_source="ExpenseService.ImportExpenses",
+                    exception="NULL",
+                    user_id=user_id
+                )
+        if progress["categories_created"]:
+            delete_cache(categories_cache_key(user_id))
+        db.close()
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from Logging.FileAndDbLogging import log_event
+from Models.Database import SessionLocal
+from Models.Table.Logging import Logging as LoggingModel
+from Webhook.celery_worker import celery_app
+
+# Log rows older than this are moved out of the hot table
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", 90))
+# Rows archived and deleted per transaction, so locks and WAL stay bounded
+LOG_ARCHIVE_BATCH_SIZE = int(os.getenv("LOG_ARCHIVE_BATCH_SIZE", 5000))
+# Rows are deleted once written here, so it must be durable storage (not /tmp); the job is skipped when unset
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR")
+
+ARCHIVE_FIELDS = ["id", "loglevel", "message", "event_source", "event_category", "event_action", "ip_address",
+                  "exception", "created_at", "user_id"]
+
+
+def _append_batch(path: str, rows: list):
+    """
+    Appends rows as JSON lines in a new gzip member and fsyncs before returning, so nothing is deleted
+    from the table until it is on disk. Concatenated members read back as one stream (gzip.open / zcat).
+    """
+    with open(path, "ab") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="ab") as archive:
+            for row in rows:
+                record = {field: getattr(row, field) for field in ARCHIVE_FIELDS}
+                record["created_at"] = row.created_at.isoformat()
+                archive.write((json.dumps(record) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+@celery_app.task(bind=True, name="archive_old_logs")
+def archive_old_logs(self, retention_days: int = None):
+    """
+    Moves logging rows older than retention_days (LOG_RETENTION_DAYS) to a gzipped JSONL file in
+    LOG_ARCHIVE_DIR, deleting them in batches of LOG_ARCHIVE_BATCH_SIZE. Safe to re-run after a crash:
+    a batch is only deleted once it is written, at worst it is archived twice.
+    """
+    cutoff = datetime.now() - timedelta(days=retention_days or LOG_RETENTION_DAYS)
+    if not LOG_ARCHIVE_DIR:
+        log_event("LoggingTasks.ArchiveOldLogs", "ERROR",
+                  "LOG_ARCHIVE_DIR is not set, old logs were not archived or deleted")
+        return {"archived": 0, "file": None, "cutoff": cutoff.isoformat(), "skipped": "LOG_ARCHIVE_DIR is not set"}
+    os.makedirs(LOG_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(LOG_ARCHIVE_DIR, f"logging-before-{cutoff:%Y%m%d}-{datetime.now():%Y%m%d%H%M%S}.jsonl.gz")
+
+    db = SessionLocal()
+    archived = 0
+    try:
+        while True:
+            rows = db.query(LoggingModel).filter(
+                LoggingModel.created_at < cutoff
+            ).order_by(LoggingModel.created_at).limit(LOG_ARCHIVE_BATCH_SIZE).all()
+            if not rows:
+                break
+
+            _append_batch(path, rows)
+            db.query(LoggingModel).filter(
+                LoggingModel.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            db.commit()
+            db.expunge_all()
+
+            archived += len(rows)
+            if self.request.id:
+                self.update_state(state="PROGRESS", meta={"archived": archived})
+
+        return {"archived": archived, "file": path if archived else None, "cutoff": cutoff.isoformat()}
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,6 +1,10 @@
 from fastapi import HTTPException
+from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
 from starlette import status
-from Models.Table.User import User as UserModel
+from Models.Table.ReportRun import ReportRun
+from Models.Table.ReportDelivery import ReportDelivery
+from Logging.FileAndDbLogging import log_event
 from Services.EmailService import EmailService
 from Webhook.celery_worker import celery_app
 from Services.PdfService import PdfService
@@ -9,43 +13,214 @@ from Models.Database import SessionLocal
 from datetime import datetime, timedelta
 from Models.Table.Subscriber import Subscriber
 
-@celery_app.task(name="generate_and_send_monthly_reports")
-def generate_and_send_monthly_reports():
+# A delivery stuck in "sending" longer than this is assumed to belong to a crashed worker
+STALE_DELIVERY_AFTER = timedelta(minutes=30)
+MAX_DELIVERY_ATTEMPTS = 3
+RETRY_FAILED_AFTER_SECONDS = 300
+
+
+def _report_progress(task, total: int, sent: int, skipped: int, failed: int):
+    # update_state needs a task id, which only exists when running inside a worker
+    if task.request.id:
+        task.update_state(
+            state="PROGRESS",
+            meta={"total": total, "sent": sent, "skipped": skipped, "failed": failed}
+        )
+
+
+def _get_or_create_run(db, period: str) -> ReportRun:
+    run = db.query(ReportRun).filter(ReportRun.period == period).first()
+    if run:
+        return run
+
+    run = ReportRun(period=period, status="running")
+    db.add(run)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker created the run for this period first
+        db.rollback()
+        return db.query(ReportRun).filter(ReportRun.period == period).first()
+    db.refresh(run)
+    return run
+
+
+def _claim_delivery(db, run: ReportRun, subscriber_id: int):
+    """Returns (delivery, claimed). Only the caller that claimed a delivery may generate and send it."""
+    delivery = db.query(ReportDelivery).filter(
+        ReportDelivery.period == run.period,
+        ReportDelivery.subscriber_id == subscriber_id
+    ).first()
+
+    if delivery is None:
+        delivery = ReportDelivery(run_id=run.id, period=run.period, subscriber_id=subscriber_id,
+                                  status="pending", attempts=0)
+        db.add(delivery)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            delivery = db.query(ReportDelivery).filter(
+                ReportDelivery.period == run.period,
+                ReportDelivery.subscriber_id == subscriber_id
+            ).first()
+
+    claimed = db.query(ReportDelivery).filter(
+        ReportDelivery.id == delivery.id,
+        ReportDelivery.attempts < MAX_DELIVERY_ATTEMPTS,
+        or_(
+            ReportDelivery.status.in_(["pending", "failed"]),
+            and_(ReportDelivery.status == "sending",
+                 ReportDelivery.updated_at < datetime.now() - STALE_DELIVERY_AFTER)
+        )
+    ).update({
+        "status": "sending",
+        "attempts": ReportDelivery.attempts + 1,
+        "run_id": run.id,
+        "updated_at": datetime.now()
+    }, synchronize_session=False)
+    db.commit()
+    db.refresh(delivery)
+
+    return delivery, claimed == 1
+
+
+def _finish_delivery(db, delivery: ReportDelivery, delivery_status: str, error: str = None):
+    delivery.status = delivery_status
+    delivery.error = error
+    if delivery_status == "sent":
+        delivery.sent_at = datetime.now()
+    db.commit()
+
+
+def _rearm_failed_deliveries(db, period: str) -> int:
+    """Gives deliveries that failed MAX_DELIVERY_ATTEMPTS times in period a fresh set of attempts."""
+    rearmed = db.query(ReportDelivery).filter(
+        ReportDelivery.period == period,
+        ReportDelivery.status == "failed"
+    ).update({"attempts": 0, "updated_at": datetime.now()}, synchronize_session=False)
+    db.commit()
+    return rearmed
+
+
+@celery_app.task(bind=True, name="generate_and_send_monthly_reports")
+def generate_and_send_monthly_reports(self, retry_failed: bool = False):
+    """
+    retry_failed re-arms deliveries that were given up on, e.g. after an SMTP outage that outlasted the
+    automatic retries. Only the first execution does so; the task's own retries keep the attempt cap.
+    """
     db = SessionLocal()
     try:
         subscribers = db.query(Subscriber).filter(Subscriber.is_active == True).all()
         if not subscribers:
-            return "No active subscribers found"
+            db.close()
+            return {"total": 0, "sent": 0, "skipped": 0, "failed": 0, "message": "No active subscribers found"}
 
-        expense_service = ExpenseService(db)
-        pdf_service = PdfService(db, expense_service)
+        pdf_service = PdfService(db, ExpenseService(db))
         email_service = EmailService()
 
+        last_day_prev_month = datetime.now().replace(day=1) - timedelta(days=1)
+        period = last_day_prev_month.strftime("%Y-%m")
+        run = _get_or_create_run(db, period)
+        if retry_failed and not self.request.retries:
+            rearmed = _rearm_failed_deliveries(db, period)
+            log_event("PdfTasks.MonthlyReport", "INFO", f"Re-armed {rearmed} failed {period} report deliveries")
+
+        total = len(subscribers)
+        sent = 0
+        skipped = 0
+        failed = 0
+        _report_progress(self, total, sent, skipped, failed)
+
+        # Checkpointed deliveries are counted up front; only the rest is loaded and rendered
+        finished = {
+            delivery.subscriber_id: delivery.status
+            for delivery in db.query(ReportDelivery).filter(ReportDelivery.period == period).all()
+            if delivery.status in ("sent", "skipped")
+            or (delivery.status == "failed" and delivery.attempts >= MAX_DELIVERY_ATTEMPTS)
+        }
+        pending = {}
         for sub in subscribers:
-            user = db.query(UserModel).filter(UserModel.email == sub.email).first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-
-            # Generate PDF
-            expenses = expense_service.get_previous_month_expenses(user.id, skip=0, limit=1000)
-            pdf_buffer = pdf_service.generate_expenses_pdf(expenses)
-
-            last_day_prev_month = datetime.now().replace(day=1) - timedelta(days=1)
-
-            # Send email
-            subject = f"Your {last_day_prev_month.strftime('%B-%Y')} Expense Report from ExpenseTracker"
-            body = email_service.monthly_report_pdf_template(sub.name)
-            filename = f"ExpenseTracker-{last_day_prev_month.strftime('%B-%Y')}-Report.pdf"
-            email_service.send_email_with_pdf(
-                user_email=sub.email,
-                subject=subject,
-                body=body,
-                pdf_buffer=pdf_buffer,
-                filename=filename
-            )
+            if sub.id in finished:
+                if finished[sub.id] == "sent":
+                    sent += 1
+                elif finished[sub.id] == "failed":
+                    failed += 1
+                else:
+                    skipped += 1
+            else:
+                pending[sub.id] = sub
+        _report_progress(self, total, sent, skipped, failed)
+
+        # The streamed read runs on its own session so per-delivery commits don't close its cursor
+        read_db = SessionLocal()
+        try:
+            loader = ExpenseService(read_db)
+            for subscriber_id, user_id, expenses in loader.stream_previous_month_expenses_by_subscriber(
+                    list(pending.keys()), limit_per_user=1000):
+                sub = pending.pop(subscriber_id)
+                delivery, claimed = _claim_delivery(db, run, sub.id)
+                if not claimed:
+                    # Handled by a concurrent run of this period
+                    if delivery.status == "sent":
+                        sent += 1
+                    elif delivery.status == "failed":
+                        failed += 1
+                    else:
+                        skipped += 1
+                    _report_progress(self, total, sent, skipped, failed)
+                    continue
 
+                try:
+                    # Generate PDF
+                    pdf_buffer = pdf_service.generate_expenses_pdf(expenses)
+
+                    # Send email
+                    subject = f"Your {last_day_prev_month.strftime('%B-%Y')} Expense Report from ExpenseTracker"
+                    body = email_service.monthly_report_pdf_template(sub.name)
+                    filename = f"ExpenseTracker-{last_day_prev_month.strftime('%B-%Y')}-Report.pdf"
+                    email_service.send_email_with_pdf(
+                        user_email=sub.email,
+                        subject=subject,
+                        body=body,
+                        pdf_buffer=pdf_buffer,
+                        filename=filename
+                    )
+                except Exception as ex:
+                    db.rollback()
+                    error = str(getattr(ex, "detail", ex))
+                    _finish_delivery(db, delivery, "failed", error)
+                    if delivery.attempts >= MAX_DELIVERY_ATTEMPTS:
+                        log_event("PdfTasks.MonthlyReport", "ERROR",
+                                  f"Gave up on the {period} report for subscriber {sub.id} after "
+                                  f"{delivery.attempts} attempts; trigger it again with retry_failed=true",
+                                  exception=error)
+                    failed += 1
+                    _report_progress(self, total, sent, skipped, failed)
+                    continue
+
+                _finish_delivery(db, delivery, "sent")
+                sent += 1
+                _report_progress(self, total, sent, skipped, failed)
+        finally:
+            read_db.close()
+
+        # Whatever the loader did not yield has no matching user
+        for sub in pending.values():
+            delivery, claimed = _claim_delivery(db, run, sub.id)
+            if claimed:
+                _finish_delivery(db, delivery, "skipped", "User not found")
+            skipped += 1
+            _report_progress(self, total, sent, skipped, failed)
+
+        run.total = total
+        run.sent = sent
+        run.skipped = skipped
+        run.failed = failed
+        run.status = "completed" if failed == 0 else "partial"
+        run.finished_at = datetime.now()
+        db.commit()
         db.close()
-        return f"Reports sent to {len(subscribers)} subscribers."
     except Exception as ex:
         db.close()
         code = getattr(ex, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -55,4 +230,16 @@ def generate_and_send_monthly_reports():
         raise HTTPException(
             status_code=code,
             detail=str(ex)
-        )
\ No newline at end of file
+        )
+
+    # Deliveries that failed are retried by re-running the task; sent ones are skipped by their checkpoint
+    if failed and self.request.id and self.request.retries < MAX_DELIVERY_ATTEMPTS - 1:
+        raise self.retry(countdown=RETRY_FAILED_AFTER_SECONDS, max_retries=MAX_DELIVERY_ATTEMPTS - 1)
+
+    return {
+        "total": total,
+        "sent": sent,
+        "skipped": skipped,
+        "failed": failed,
+        "message": f"Reports sent to {sent} subscribers."
+    }
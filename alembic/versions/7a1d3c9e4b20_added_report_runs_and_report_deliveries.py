@@ -0,0 +1,73 @@
+"""added report runs and report deliveries tables
+
+Revision ID: 7a1d3c9e4b20
+Revises: c2c31b570432
+Create Date: 2026-10-19 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1d3c9e4b20'
+down_revision: Union[str, Sequence[str], None] = 'c2c31b570432'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # subscribers was created outside of alembic, make sure it exists before referencing it
+    if not sa.inspect(op.get_bind()).has_table('subscribers'):
+        op.create_table('subscribers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('subscribed_at', sa.DateTime(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+        )
+        op.create_index(op.f('ix_subscribers_id'), 'subscribers', ['id'], unique=False)
+
+    op.create_table('report_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period')
+    )
+    op.create_index(op.f('ix_report_runs_id'), 'report_runs', ['id'], unique=False)
+    op.create_table('report_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('subscriber_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['run_id'], ['report_runs.id'], ),
+    sa.ForeignKeyConstraint(['subscriber_id'], ['subscribers.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period', 'subscriber_id', name='uq_report_deliveries_period_subscriber')
+    )
+    op.create_index(op.f('ix_report_deliveries_id'), 'report_deliveries', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_report_deliveries_id'), table_name='report_deliveries')
+    op.drop_table('report_deliveries')
+    op.drop_index(op.f('ix_report_runs_id'), table_name='report_runs')
+    op.drop_table('report_runs')
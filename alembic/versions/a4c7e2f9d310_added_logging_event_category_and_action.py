@@ -0,0 +1,63 @@
+"""added logging event_category and event_action
+
+Revision ID: a4c7e2f9d310
+Revises: f1a8d5e3b729
+Create Date: 2026-10-19 20:31:50.227861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2f9d310'
+down_revision: Union[str, Sequence[str], None] = 'f1a8d5e3b729'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows updated per statement while backfilling; each batch commits on its own so row locks stay short
+BACKFILL_BATCH_SIZE = 50000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('logging', sa.Column('event_category', sa.String(length=100), nullable=True))
+    op.add_column('logging', sa.Column('event_action', sa.String(length=150), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        split = ("event_category = split_part(event_source, '.', 1), "
+                 "event_action = NULLIF(split_part(event_source, '.', 2), '')")
+    else:
+        split = ("event_category = CASE WHEN instr(event_source, '.') > 0 "
+                 "THEN substr(event_source, 1, instr(event_source, '.') - 1) ELSE event_source END, "
+                 "event_action = CASE WHEN instr(event_source, '.') > 0 "
+                 "THEN NULLIF(substr(event_source, instr(event_source, '.') + 1), '') END")
+
+    with op.get_context().autocommit_block():
+        first_id, last_id = bind.execute(sa.text("SELECT min(id), max(id) FROM logging")).one()
+        if first_id is not None:
+            for start in range(first_id, last_id + 1, BACKFILL_BATCH_SIZE):
+                bind.execute(sa.text(f"UPDATE logging SET {split} WHERE id >= :start AND id < :end"),
+                             {"start": start, "end": start + BACKFILL_BATCH_SIZE})
+
+        op.create_index('ix_logging_user_id_event_category_created_at', 'logging',
+                        ['user_id', 'event_category', sa.text('created_at DESC')], unique=False,
+                        if_not_exists=True, postgresql_concurrently=True)
+        # Activity-log pages no longer filter on event_source prefixes, so this index only costs writes now
+        op.drop_index('ix_logging_user_id_event_source', table_name='logging', if_exists=True,
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_logging_user_id_event_source', 'logging', ['user_id', 'event_source'], unique=False,
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_logging_user_id_event_category_created_at', table_name='logging', if_exists=True,
+                      postgresql_concurrently=True)
+    op.drop_column('logging', 'event_action')
+    op.drop_column('logging', 'event_category')
@@ -0,0 +1,49 @@
+"""unique category name per user
+
+Revision ID: b3e9f2a61c57
+Revises: 7a1d3c9e4b20
+Create Date: 2026-10-19 17:52:08.301947
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9f2a61c57'
+down_revision: Union[str, Sequence[str], None] = '7a1d3c9e4b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicates of a (user_id, name) pair collapse into the one with the lowest id
+CANONICAL_CATEGORY_ID = """
+    (SELECT MIN(keep.id) FROM categories dup
+     JOIN categories keep ON keep.user_id = dup.user_id AND keep.name = dup.name
+     WHERE dup.id = {table}.category_id)
+"""
+
+IS_DUPLICATE = """
+    EXISTS (SELECT 1 FROM categories keep
+            WHERE keep.user_id = categories.user_id AND keep.name = categories.name AND keep.id < categories.id)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Earlier racing find-or-create calls could insert the same category twice; merge them before enforcing it
+    for table in ('transactions', 'budgets'):
+        op.execute(sa.text(
+            f"UPDATE {table} SET category_id = {CANONICAL_CATEGORY_ID.format(table=table)} "
+            f"WHERE category_id IN (SELECT id FROM categories WHERE {IS_DUPLICATE})"
+        ))
+    op.execute(sa.text(f"DELETE FROM categories WHERE {IS_DUPLICATE}"))
+
+    op.create_index('uq_categories_user_id_name', 'categories', ['user_id', 'name'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_categories_user_id_name', table_name='categories')
@@ -0,0 +1,45 @@
+"""added indexes for hot filter columns
+
+Revision ID: c8d4e1f07a92
+Revises: b3e9f2a61c57
+Create Date: 2026-10-19 18:20:44.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d4e1f07a92'
+down_revision: Union[str, Sequence[str], None] = 'b3e9f2a61c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# categories.user_id is already covered by uq_categories_user_id_name
+INDEXES = [
+    ('ix_transactions_user_id_date', 'transactions', ['user_id', 'date']),
+    ('ix_transactions_category_id_date', 'transactions', ['category_id', 'date']),
+    ('ix_budgets_user_id_month', 'budgets', ['user_id', 'month']),
+    ('ix_budgets_user_id_category_id', 'budgets', ['user_id', 'category_id']),
+    ('ix_logging_user_id_event_source', 'logging', ['user_id', 'event_source']),
+    ('ix_subscribers_is_active', 'subscribers', ['is_active']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY doesn't block writes but can't run inside a transaction.
+    # if_not_exists lets an interrupted run be repeated; drop any index it left INVALID first.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
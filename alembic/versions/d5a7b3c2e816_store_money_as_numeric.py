@@ -0,0 +1,45 @@
+"""store money as numeric
+
+Revision ID: d5a7b3c2e816
+Revises: c8d4e1f07a92
+Create Date: 2026-10-19 18:47:12.904166
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7b3c2e816'
+down_revision: Union[str, Sequence[str], None] = 'c8d4e1f07a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MONEY_COLUMNS = [
+    ('transactions', 'amount'),
+    ('budgets', 'limit_amount'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Float values like 19.989999999 are rounded to the cent they were entered as
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.Float(),
+                        type_=sa.Numeric(precision=14, scale=2),
+                        existing_nullable=False,
+                        postgresql_using=f'round({column}::numeric, 2)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column,
+                        existing_type=sa.Numeric(precision=14, scale=2),
+                        type_=sa.Float(),
+                        existing_nullable=False,
+                        postgresql_using=f'{column}::double precision')
@@ -0,0 +1,107 @@
+"""partition transactions by month
+
+Revision ID: e6b2c9d4f153
+Revises: d5a7b3c2e816
+Create Date: 2026-10-19 19:26:35.180442
+
+Opt-in: only does anything on PostgreSQL with TRANSACTIONS_PARTITIONED=true, otherwise transactions stays
+a plain table. Rewrites the table, so run it in a maintenance window on large databases.
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from Models.Partitions import TRANSACTIONS_PARTITIONED, create_default_partition, ensure_partitions
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2c9d4f153'
+down_revision: Union[str, Sequence[str], None] = 'd5a7b3c2e816'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = "id, amount, date, description, payment_method, category_id, user_id"
+
+INDEXES = [
+    ('ix_transactions_id', ['id']),
+    ('ix_transactions_user_id_date', ['user_id', 'date']),
+    ('ix_transactions_category_id_date', ['category_id', 'date']),
+]
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text("SELECT relkind FROM pg_class WHERE relname = 'transactions'")).scalar() == 'p'
+
+
+def _move_aside(old_name: str):
+    """Renames the current table and frees the index, constraint and sequence names for its replacement."""
+    op.execute(f"ALTER TABLE transactions RENAME TO {old_name}")
+    op.execute(f"ALTER TABLE {old_name} RENAME CONSTRAINT transactions_pkey TO {old_name}_pkey")
+    for name, _ in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY NONE")
+
+
+def _create_table(primary_key: str, partition_by: str = ""):
+    op.execute(f"""
+        CREATE TABLE transactions (
+            id integer NOT NULL DEFAULT nextval('transactions_id_seq'),
+            amount numeric(14, 2) NOT NULL,
+            date timestamp without time zone {'NOT NULL' if partition_by else ''},
+            description varchar(255),
+            payment_method varchar(255),
+            category_id integer NOT NULL REFERENCES categories (id),
+            user_id integer NOT NULL REFERENCES users (id),
+            PRIMARY KEY ({primary_key})
+        ) {partition_by}
+    """)
+    op.execute("ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if not TRANSACTIONS_PARTITIONED or bind.dialect.name != 'postgresql' or _is_partitioned(bind):
+        return
+
+    # The partition key can't be NULL and there is no other column to take a date from, so refuse rather
+    # than invent one; checked before anything is renamed
+    undated = bind.execute(sa.text("SELECT count(*) FROM transactions WHERE date IS NULL")).scalar()
+    if undated:
+        raise RuntimeError(
+            f"{undated} transactions have no date. Set their dates (or delete them) before partitioning: "
+            f"SELECT id, user_id, amount, description FROM transactions WHERE date IS NULL"
+        )
+
+    _move_aside('transactions_unpartitioned')
+    _create_table('id, date', 'PARTITION BY RANGE (date)')
+
+    create_default_partition(bind)
+    oldest = bind.execute(sa.text("SELECT min(date) FROM transactions_unpartitioned")).scalar()
+    ensure_partitions(bind, oldest or datetime.now())
+
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_unpartitioned")
+    op.execute("DROP TABLE transactions_unpartitioned")
+
+    # Created on the parent, so every existing and future partition gets them
+    for name, columns in INDEXES:
+        op.create_index(name, 'transactions', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql' or not _is_partitioned(bind):
+        return
+
+    _move_aside('transactions_partitioned')
+    _create_table('id')
+    op.execute(f"INSERT INTO transactions ({COLUMNS}) SELECT {COLUMNS} FROM transactions_partitioned")
+    op.execute("DROP TABLE transactions_partitioned CASCADE")
+
+    for name, columns in INDEXES:
+        op.create_index(name, 'transactions', columns, unique=False)
@@ -0,0 +1,31 @@
+"""added logging created_at index
+
+Revision ID: f1a8d5e3b729
+Revises: e6b2c9d4f153
+Create Date: 2026-10-19 19:58:03.642519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a8d5e3b729'
+down_revision: Union[str, Sequence[str], None] = 'e6b2c9d4f153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The retention job selects the oldest rows by created_at; built CONCURRENTLY as logging is written constantly
+    with op.get_context().autocommit_block():
+        op.create_index('ix_logging_created_at', 'logging', ['created_at'], unique=False, if_not_exists=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_logging_created_at', table_name='logging', if_exists=True, postgresql_concurrently=True)